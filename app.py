@@ -5,12 +5,18 @@ Now with Firestore support and 12-month historical tracking
 """
 
 from flask import Flask, request, jsonify, send_file, render_template
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
 import sys
 from datetime import datetime
 import threading
 
+try:
+    import orjson
+except ImportError:  # Fall back to Flask's stdlib JSON provider
+    orjson = None
+
 # Add project paths
 sys.path.insert(0, '/mnt/project')
 
@@ -21,7 +27,29 @@ from models import (
 from data_collector import DataCollector
 from trendline_analyzer import TrendlineAnalyzer
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson. Datetimes (e.g. Firestore
+    recorded_at) are passed through to Flask's default handler so API
+    responses keep the same HTTP-date format as the stdlib provider.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__, static_folder='static', template_folder='templates')
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 CORS(app)
 
 # Initialize database
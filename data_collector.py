@@ -32,9 +32,27 @@ Improvement: Was 36+ calls (12 months × 3 sources), now ~15 calls with full his
 import sys
 import os
 import json
+import argparse
+import calendar
+import concurrent.futures
+import functools
+import hashlib
+import itertools
+import threading
+import time
+import traceback
+from collections import namedtuple
 from datetime import datetime, timedelta
+from types import MappingProxyType, SimpleNamespace
 from typing import Dict, List
-from dateutil.relativedelta import relativedelta
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib decoder
+    orjson = None
 
 # Add parent directory to path to import the email and social scripts
 sys.path.insert(0, '/mnt/project')
@@ -43,6 +61,8 @@ from models import (
     Database, Customer, CustomerCredential, HistoricalMetric, 
     TopPerformer, get_benchmark
 )
+from rate_limiter import TokenBucket
+from response_cache import ResponseCache
 
 # Import the existing analytics modules
 from email_metrics_fetcher import InstantlyFetcher, KlaviyoFetcher
@@ -53,6 +73,112 @@ from social_media_analytics import (
     get_instagram_media_insights
 )
 
+# Section divider used by the collection summaries
+_SEPARATOR = '=' * 70
+
+# One calendar month of a collection range
+MonthWindow = namedtuple('MonthWindow', 'days year month start end')
+
+
+def _month_window(year: int, month: int) -> MonthWindow:
+    """Build the MonthWindow for a calendar month"""
+    days = calendar.monthrange(year, month)[1]
+    return MonthWindow(days, year, month, datetime(year, month, 1), datetime(year, month, days))
+
+
+# Shared read-only default for .get() lookups on missing payload sections,
+# so misses don't allocate a fresh dict each time
+_EMPTY = MappingProxyType({})
+
+# Shared keep-alive session for the GA4 endpoint so repeated fetches reuse
+# one TCP/TLS connection instead of handshaking on every call
+_GA4_SESSION = requests.Session()
+_GA4_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=0))
+_GA4_SESSION.mount('https://', _GA4_ADAPTER)
+_GA4_SESSION.mount('http://', _GA4_ADAPTER)
+
+# GA4 endpoint budget: bursts of 5, refilled at 5 requests per minute
+_GA4_BUCKET = TokenBucket(capacity=5, refill_per_sec=5 / 60)
+
+# Closed GA4 months never change, so their payloads are kept on disk
+_GA4_CACHE = ResponseCache('ga4')
+
+# Days after a month ends before its totals are treated as final and cached;
+# GA4 keeps processing late hits for 24-48 hours, and Instantly counts
+# opens/replies that trickle in after the send month
+MONTH_SETTLE_DAYS = 3
+
+# Same for per-month Instantly aggregates, keyed by customer, API key hash
+# and month
+_EMAIL_CACHE = ResponseCache('email')
+
+
+def _first_unsettled_month(now: datetime) -> str:
+    """YYYY-MM of the earliest month that hasn't settled (see MONTH_SETTLE_DAYS)"""
+    return (now - timedelta(days=MONTH_SETTLE_DAYS)).strftime('%Y-%m')
+
+
+def _next_month_str(month_str: str) -> str:
+    """Return the YYYY-MM string for the month after month_str"""
+    year, month = divmod(int(month_str[:4]) * 12 + int(month_str[5:7]), 12)
+    return f"{year}-{month + 1:02d}"
+
+
+# Facebook/Instagram account discovery results, keyed by a hash of the
+# system user token so the raw token never sits in the cache key
+_ACCOUNTS_TTL_SECONDS = 3600
+_ACCOUNTS_CACHE = {}
+_ACCOUNTS_LOCK = threading.Lock()
+
+
+def _token_key(system_token: str) -> str:
+    return hashlib.sha256(system_token.encode()).hexdigest()
+
+
+def get_accounts_cached(system_token: str) -> List[Dict]:
+    """
+    Return the page/Instagram account list for a system token, reusing a
+    previous lookup for up to an hour. Empty results are not cached.
+    """
+    key = _token_key(system_token)
+    now = time.monotonic()
+    
+    with _ACCOUNTS_LOCK:
+        cached = _ACCOUNTS_CACHE.get(key)
+        if cached and now - cached[0] < _ACCOUNTS_TTL_SECONDS:
+            print(f"  [CACHE] Reusing {len(cached[1])} social media accounts")
+            return cached[1]
+    
+    accounts = get_all_pages_and_instagram_accounts(system_token)
+    
+    if accounts:
+        with _ACCOUNTS_LOCK:
+            _ACCOUNTS_CACHE[key] = (now, accounts)
+    return accounts
+
+
+def invalidate_accounts_cache(system_token: str = None):
+    """Drop cached accounts for one token, or all tokens when none is given"""
+    with _ACCOUNTS_LOCK:
+        if system_token is None:
+            _ACCOUNTS_CACHE.clear()
+        else:
+            _ACCOUNTS_CACHE.pop(_token_key(system_token), None)
+
+
+def make_http_session() -> requests.Session:
+    """Pooled session for vendor APIs that retries throttled/5xx responses"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5,
+                          status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 
 class GA4Fetcher:
     """Fetch website analytics from enhanced GA4 endpoint with monthly support"""
@@ -68,16 +194,23 @@ class GA4Fetcher:
         self.property_id = property_id
         # Use the enhanced GA4 endpoint (now supports monthly segments)
         self.endpoint_url = endpoint_url or "https://ga4-analytics-ioneema27a-uc.a.run.app"
+        self.session = _GA4_SESSION
         print(f"[INFO] Using enhanced GA4 endpoint: {self.endpoint_url}")
     
-    def get_monthly_metrics_bulk(self, start_month: str, end_month: str) -> Dict:
+    def get_monthly_metrics_bulk(self, start_month: str, end_month: str,
+                                 force_refresh: bool = False) -> Dict:
         """
         Get GA4 metrics for multiple months in ONE API call
         Uses the enhanced endpoint's by_month structure
         
+        Months that closed at least MONTH_SETTLE_DAYS ago are served from the
+        disk cache when present, so repeat runs only fetch from the first
+        uncached month on.
+        
         Args:
             start_month: Start month in YYYY-MM format (e.g., "2024-02")
             end_month: End month in YYYY-MM format (e.g., "2025-01")
+            force_refresh: Ignore cached months and fetch the full range
         
         Returns:
             Dict with by_month structure: {
@@ -86,14 +219,46 @@ class GA4Fetcher:
                 ...
             }
         """
-        import requests
+        # Months before this one are final; later ones may still gain data
+        settled_month = _first_unsettled_month(datetime.now())
+        by_month = {}
+        fetch_start = start_month
+        
+        if not force_refresh:
+            while fetch_start <= end_month and fetch_start < settled_month:
+                cached = _GA4_CACHE.get(f"{self.property_id}:{fetch_start}")
+                if cached is None:
+                    break
+                by_month[fetch_start] = cached
+                fetch_start = _next_month_str(fetch_start)
+            
+            if by_month:
+                print(f"[CACHE] Loaded {len(by_month)} closed GA4 months for {self.property_id}")
+        
+        if fetch_start > end_month:
+            return by_month
+        
+        fetched = self._fetch_by_month(fetch_start, end_month)
         
+        for month_str, month_data in fetched.items():
+            if month_str < settled_month:
+                _GA4_CACHE.set(f"{self.property_id}:{month_str}", month_data)
+        
+        by_month.update(fetched)
+        return by_month
+    
+    def _fetch_by_month(self, start_month: str, end_month: str) -> Dict:
+        """Call the GA4 endpoint for a month range and return its by_month data"""
         print(f"[INFO] Fetching GA4 bulk monthly data for {self.property_id}")
         print(f"[INFO] Date range: {start_month} to {end_month}")
         
         try:
+            waited = _GA4_BUCKET.acquire()
+            if waited:
+                print(f"[INFO] GA4 rate limit: waited {waited:.1f}s")
+            
             # Call enhanced endpoint with month range
-            response = requests.get(
+            response = self.session.get(
                 f"{self.endpoint_url}/ga4",
                 params={
                     "start_month": start_month,
@@ -103,7 +268,7 @@ class GA4Fetcher:
             )
             
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content) if orjson else response.json()
             
             # Check response structure
             if data.get('status') != 'success':
@@ -111,7 +276,7 @@ class GA4Fetcher:
                 return {}
             
             # Extract property data
-            property_data = data.get('data', {}).get(self.property_id, {})
+            property_data = data.get('data', _EMPTY).get(self.property_id, {})
             
             if not property_data:
                 print(f"[WARNING] No data found for property {self.property_id}")
@@ -130,16 +295,15 @@ class GA4Fetcher:
             
         except requests.exceptions.RequestException as e:
             print(f"[ERROR] Failed to fetch bulk GA4 data: {e}")
-            import traceback
             traceback.print_exc()
             return {}
         except Exception as e:
             print(f"[ERROR] Error parsing GA4 response: {e}")
-            import traceback
             traceback.print_exc()
             return {}
     
-    def get_metrics(self, start_date: datetime, end_date: datetime) -> Dict:
+    def get_metrics(self, start_date: datetime, end_date: datetime,
+                    force_refresh: bool = False) -> Dict:
         """
         Get GA4 metrics for a specific date range (single month)
         Used for current period collection
@@ -147,12 +311,11 @@ class GA4Fetcher:
         Args:
             start_date: Start date
             end_date: End date
+            force_refresh: Bypass the closed-month disk cache
         
         Returns:
             Dict with metrics by journey stage
         """
-        import requests
-        
         print(f"[INFO] Fetching GA4 metrics for property {self.property_id}")
         print(f"[INFO] Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
         
@@ -162,7 +325,7 @@ class GA4Fetcher:
             end_month = end_date.strftime('%Y-%m')
             
             # Call bulk endpoint (works for single month too)
-            by_month = self.get_monthly_metrics_bulk(start_month, end_month)
+            by_month = self.get_monthly_metrics_bulk(start_month, end_month, force_refresh)
             
             if not by_month:
                 return self._empty_metrics()
@@ -180,40 +343,43 @@ class GA4Fetcher:
             
         except Exception as e:
             print(f"[ERROR] Failed to fetch GA4 metrics: {e}")
-            import traceback
             traceback.print_exc()
             return self._empty_metrics()
     
-    def _parse_month_data(self, month_data: Dict) -> Dict:
-        """Parse monthly data into expected format"""
+    @staticmethod
+    def _parse_month_data(month_data: Dict) -> Dict:
+        """Parse one month of the GA4 by_month payload into expected format"""
+        # Local aliases skip the builtins lookup on every conversion
+        _int = int
+        _float = float
         
-        awareness = month_data.get('awareness', {})
-        engagement = month_data.get('engagement', {})
-        conversion = month_data.get('conversion', {})
-        retention = month_data.get('retention', {})
-        advocacy = month_data.get('advocacy', {})
+        awareness = month_data.get('awareness', _EMPTY)
+        engagement = month_data.get('engagement', _EMPTY)
+        conversion = month_data.get('conversion', _EMPTY)
+        retention = month_data.get('retention', _EMPTY)
+        advocacy = month_data.get('advocacy', _EMPTY)
         
         return {
             'awareness': {
-                'sessions': int(awareness.get('sessions', 0)),
-                'users': int(awareness.get('users', 0))
+                'sessions': _int(awareness.get('sessions', 0)),
+                'users': _int(awareness.get('users', 0))
             },
             'engagement': {
-                'pages_per_session': float(engagement.get('pages_per_session', 0)),
-                'avg_session_duration': float(engagement.get('avg_session_duration', 0)),
-                'engagement_rate': float(engagement.get('engagement_rate', 0))
+                'pages_per_session': _float(engagement.get('pages_per_session', 0)),
+                'avg_session_duration': _float(engagement.get('avg_session_duration', 0)),
+                'engagement_rate': _float(engagement.get('engagement_rate', 0))
             },
             'conversion': {
-                'conversions': int(conversion.get('total_conversions', 0)),
-                'conversion_rate': float(conversion.get('conversion_rate', 0))
+                'conversions': _int(conversion.get('total_conversions', 0)),
+                'conversion_rate': _float(conversion.get('conversion_rate', 0))
             },
             'retention': {
-                'returning_users': int(retention.get('returning_users', 0)),
-                'retention_rate': float(retention.get('returning_user_rate', 0))
+                'returning_users': _int(retention.get('returning_users', 0)),
+                'retention_rate': _float(retention.get('returning_user_rate', 0))
             },
             'advocacy': {
-                'referrals': int(advocacy.get('referral_sessions', 0)),
-                'social_shares': int(advocacy.get('social_sessions', 0))
+                'referrals': _int(advocacy.get('referral_sessions', 0)),
+                'social_shares': _int(advocacy.get('social_sessions', 0))
             },
             'top_pages': []
         }
@@ -233,10 +399,34 @@ class GA4Fetcher:
 class DataCollector:
     """Collect and store data from all sources with TRUE historical tracking"""
     
-    def __init__(self, customer_id: str):
+    def __init__(self, customer_id: str, max_workers: int = 8, use_cache: bool = True,
+                 session: requests.Session = None):
         self.customer_id = customer_id
+        # When False, closed months are re-fetched instead of read from disk
+        self.use_cache = use_cache
+        # Upper bound on concurrent API requests within one source
+        self.max_workers = max_workers
+        # Single reference time so every source uses the same window
+        self._run_now = datetime.now()
         self.customer = Customer.get_by_id(customer_id)
         self.credentials = CustomerCredential.get_all_for_customer(customer_id)
+        # Fixed for the run; read once instead of per stored metric
+        self._industry = self.customer.get('industry', '') if self.customer else ''
+        
+        # Keep-alive session for the vendor APIs, reused across months and
+        # worker threads (and across customers when the caller passes one in)
+        self._http = session or make_http_session()
+        
+        # Metrics queued by _store_metric until flush_metrics writes them.
+        # Each collector thread appends to its own list, so the lock is only
+        # taken when a thread registers its buffer and when flushing.
+        self._tls = threading.local()
+        self._all_bufs = []
+        self._metrics_lock = threading.Lock()
+        
+        # Benchmarks by (medium, journey_stage, benchmark_key); the industry
+        # is fixed for this collector, so it is left out of the key
+        self._bench_cache = {}
         
     def collect_all_data(self, days: int = 30, status_callback=None, collect_history: bool = False):
         """
@@ -247,30 +437,24 @@ class DataCollector:
             status_callback: Callback function for status updates
             collect_history: If True, collect 12 months of historical data
         """
-        import concurrent.futures
-        import threading
-        
-        print(f"\n{'='*70}")
+        print(f"\n{_SEPARATOR}")
         print(f"COLLECTING DATA FOR: {self.customer['name']}")
         print(f"Industry: {self.customer['industry']}")
         print(f"Historical Collection: {'ENABLED (12 months)' if collect_history else 'DISABLED (current only)'}")
-        print(f"{'='*70}\n")
+        print(f"{_SEPARATOR}\n")
         
         if collect_history:
             # Collect 12 months of historical data with BULK API CALLS
             self.collect_historical_data_optimized(status_callback)
         else:
             # Collect current period only (parallel execution)
-            completed = {'social': False, 'email': False, 'website': False}
-            lock = threading.Lock()
-            
             def update_status(source, message, progress):
                 """Update status safely from any thread"""
                 if status_callback:
                     status_callback(source, message, progress)
             
             def collect_with_status(collect_func, source_name, emoji, progress_start):
-                """Wrapper to collect with status updates"""
+                """Wrapper to collect with status updates; returns True on success"""
                 try:
                     print(f"[THREAD] Starting {source_name} collection thread")
                     update_status(source_name, f"{emoji} Collecting {source_name} data...", progress_start)
@@ -279,17 +463,14 @@ class DataCollector:
                     print(f"[THREAD] Calling collect function for {source_name}")
                     collect_func(days)
                     
-                    with lock:
-                        completed[source_name.split()[0].lower()] = True
                     update_status(source_name, f"✅ {source_name} complete!", progress_start + 30)
                     print(f"[OK] {source_name} collection completed")
+                    return True
                 except Exception as e:
                     print(f"[ERROR] {source_name} collection thread failed: {e}")
-                    import traceback
                     traceback.print_exc()
-                    with lock:
-                        completed[source_name.split()[0].lower()] = True
                     update_status(source_name, f"⚠️ {source_name} failed: {str(e)[:50]}", progress_start + 30)
+                    return False
             
             # Run all three collections in parallel
             print(f"[INFO] Starting parallel collection with 3 threads...")
@@ -298,15 +479,19 @@ class DataCollector:
                 future_email = executor.submit(collect_with_status, self.collect_email_metrics, "Email", "📧", 40)
                 future_website = executor.submit(collect_with_status, self.collect_website_metrics, "Website", "🌐", 60)
                 
-                futures = [future_social, future_email, future_website]
-                concurrent.futures.wait(futures)
+                social_ok = future_social.result()
+                email_ok = future_email.result()
+                website_ok = future_website.result()
             
-            print(f"\n{'='*70}")
+            print(f"\n{_SEPARATOR}")
             print("DATA COLLECTION COMPLETE")
-            print(f"Social: {'✓' if completed['social'] else '✗'}")
-            print(f"Email: {'✓' if completed['email'] else '✗'}")
-            print(f"Website: {'✓' if completed['website'] else '✗'}")
-            print(f"{'='*70}\n")
+            print(f"Social: {'✓' if social_ok else '✗'}")
+            print(f"Email: {'✓' if email_ok else '✗'}")
+            print(f"Website: {'✓' if website_ok else '✗'}")
+            print(f"{_SEPARATOR}\n")
+        
+        # Write everything the collectors queued in batched commits
+        self.flush_metrics()
     
     def collect_historical_data_optimized(self, status_callback=None):
         """
@@ -314,61 +499,62 @@ class DataCollector:
         
         Total: 3 API calls instead of 36 (12 months × 3 sources)
         """
-        print(f"\n{'='*70}")
+        print(f"\n{_SEPARATOR}")
         print(f"COLLECTING 12-MONTH HISTORICAL DATA (OPTIMIZED)")
-        print(f"{'='*70}\n")
+        print(f"{_SEPARATOR}\n")
         
-        # Calculate 12 month range
-        end_date = datetime.now()
-        start_date = end_date - relativedelta(months=11)  # 11 months back + current = 12 months
+        # Calculate 12 month range (11 months back + current = 12 months)
+        windows = self._history_windows
         
-        start_month = start_date.replace(day=1)
-        end_month = end_date
+        start_month = windows[0].start
+        end_month = self._run_now
         
         print(f"[INFO] Date range: {start_month.strftime('%Y-%m')} to {end_month.strftime('%Y-%m')}")
         print(f"[INFO] Using BULK API calls for maximum efficiency\n")
         
-        # 1. COLLECT WEBSITE DATA (1 API call for all 12 months)
-        if status_callback:
-            status_callback("Historical Collection", "🌐 Fetching 12 months of website data...", 10)
-        
-        try:
-            print("[1/3] Website Analytics (GA4) - Bulk collection...")
-            self.collect_website_bulk(start_month, end_month)
-            print("✓ Website data collected (1 API call)\n")
-        except Exception as e:
-            print(f"[ERROR] Website bulk collection failed: {e}\n")
+        # The three sources hit independent APIs, so run them side by side
+        # and let the slowest one set the wall clock instead of the sum
+        sources = [
+            ("Website", "🌐", self.collect_website_bulk),
+            ("Email", "📧", functools.partial(self.collect_email_bulk, windows=windows)),
+            ("Social Media", "📱", self.collect_social_bulk),
+        ]
         
         if status_callback:
-            status_callback("Historical Collection", "📧 Fetching 12 months of email data...", 40)
-        
-        # 2. COLLECT EMAIL DATA (1 API call for all campaigns)
-        try:
-            print("[2/3] Email Metrics - Bulk collection...")
-            self.collect_email_bulk(start_month, end_month)
-            print("✓ Email data collected (1 API call)\n")
-        except Exception as e:
-            print(f"[ERROR] Email bulk collection failed: {e}\n")
+            status_callback("Historical Collection", "🔄 Fetching 12 months of website, email and social data...", 10)
         
-        if status_callback:
-            status_callback("Historical Collection", "📱 Fetching 12 months of social media data...", 70)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = {
+                executor.submit(collect_func, start_month, end_month): (source_name, emoji)
+                for source_name, emoji, collect_func in sources
+            }
+            
+            done_count = 0
+            for future in concurrent.futures.as_completed(futures):
+                source_name, emoji = futures[future]
+                done_count += 1
+                try:
+                    future.result()
+                    print(f"✓ {source_name} data collected (bulk)\n")
+                    message = f"{emoji} {source_name} history complete"
+                except Exception as e:
+                    print(f"[ERROR] {source_name} bulk collection failed: {e}\n")
+                    message = f"⚠️ {source_name} history failed: {str(e)[:50]}"
+                
+                if status_callback and done_count < len(sources):
+                    status_callback("Historical Collection", message, 10 + 30 * done_count)
         
-        # 3. COLLECT SOCIAL MEDIA DATA (1 API call with daily granularity)
-        try:
-            print("[3/3] Social Media - Bulk collection with daily data...")
-            self.collect_social_bulk(start_month, end_month)
-            print("✓ Social media data collected (1 API call)\n")
-        except Exception as e:
-            print(f"[ERROR] Social bulk collection failed: {e}\n")
+        # Persist before reporting completion so the dashboard sees the data
+        self.flush_metrics()
         
         if status_callback:
             status_callback("Historical Collection", "✅ 12-month historical collection complete!", 100)
         
-        print(f"{'='*70}")
+        print(f"{_SEPARATOR}")
         print("HISTORICAL DATA COLLECTION COMPLETE")
         print(f"Total API calls: 3 (GA4, Email, Social)")
         print(f"Time saved: ~95% compared to month-by-month approach")
-        print(f"{'='*70}\n")
+        print(f"{_SEPARATOR}\n")
     
     def collect_website_bulk(self, start_month: datetime, end_month: datetime):
         """
@@ -390,7 +576,8 @@ class DataCollector:
             end_month_str = end_month.strftime('%Y-%m')
             
             # Get ALL months in one call
-            by_month = fetcher.get_monthly_metrics_bulk(start_month_str, end_month_str)
+            by_month = fetcher.get_monthly_metrics_bulk(start_month_str, end_month_str,
+                                                        force_refresh=not self.use_cache)
             
             if not by_month:
                 print("  [WARNING] No data returned from GA4 bulk endpoint")
@@ -402,70 +589,74 @@ class DataCollector:
                 year, month = map(int, month_str.split('-'))
                 
                 # Calculate days in month
-                if month == 12:
-                    next_month_start = datetime(year + 1, 1, 1)
-                else:
-                    next_month_start = datetime(year, month + 1, 1)
-                month_start = datetime(year, month, 1)
-                days = (next_month_start - month_start).days
+                days = calendar.monthrange(year, month)[1]
                 
                 print(f"  Storing {month_str}...")
                 
-                # Parse and store metrics
-                awareness = month_data.get('awareness', {})
-                engagement = month_data.get('engagement', {})
-                conversion = month_data.get('conversion', {})
-                retention = month_data.get('retention', {})
-                advocacy = month_data.get('advocacy', {})
+                rows = []
+                
+                # Parse with the same extraction used for current-period fetches
+                metrics = GA4Fetcher._parse_month_data(month_data)
+                awareness = metrics['awareness']
+                engagement = metrics['engagement']
+                conversion = metrics['conversion']
+                retention = metrics['retention']
+                advocacy = metrics['advocacy']
                 
                 # Store awareness metrics
-                self._store_metric('website', 'awareness', 'Sessions',
-                                  int(awareness.get('sessions', 0)),
-                                  'sessions', days, year, month)
-                self._store_metric('website', 'awareness', 'Users',
-                                  int(awareness.get('users', 0)),
-                                  'users', days, year, month)
+                rows.append(('website', 'awareness', 'Sessions',
+                             awareness['sessions'],
+                             'sessions', days, year, month))
+                rows.append(('website', 'awareness', 'Users',
+                             awareness['users'],
+                             'users', days, year, month))
                 
                 # Store engagement metrics
-                self._store_metric('website', 'engagement', 'Pages per Session',
-                                  float(engagement.get('pages_per_session', 0)),
-                                  'pages_per_session', days, year, month)
-                self._store_metric('website', 'engagement', 'Avg Session Duration',
-                                  float(engagement.get('avg_session_duration', 0)),
-                                  'avg_session_duration', days, year, month)
+                rows.append(('website', 'engagement', 'Pages per Session',
+                             engagement['pages_per_session'],
+                             'pages_per_session', days, year, month))
+                rows.append(('website', 'engagement', 'Avg Session Duration',
+                             engagement['avg_session_duration'],
+                             'avg_session_duration', days, year, month))
                 
                 # Store conversion metrics
-                self._store_metric('website', 'conversion', 'Conversions',
-                                  int(conversion.get('total_conversions', 0)),
-                                  'conversions', days, year, month)
-                self._store_metric('website', 'conversion', 'Conversion Rate',
-                                  float(conversion.get('conversion_rate', 0)),
-                                  'conversion_rate', days, year, month)
+                rows.append(('website', 'conversion', 'Conversions',
+                             conversion['conversions'],
+                             'conversions', days, year, month))
+                rows.append(('website', 'conversion', 'Conversion Rate',
+                             conversion['conversion_rate'],
+                             'conversion_rate', days, year, month))
                 
                 # Store retention metrics
-                self._store_metric('website', 'retention', 'Returning Users',
-                                  int(retention.get('returning_users', 0)),
-                                  'returning_users', days, year, month)
-                self._store_metric('website', 'retention', 'Retention Rate',
-                                  float(retention.get('returning_user_rate', 0)),
-                                  'retention_rate', days, year, month)
+                rows.append(('website', 'retention', 'Returning Users',
+                             retention['returning_users'],
+                             'returning_users', days, year, month))
+                rows.append(('website', 'retention', 'Retention Rate',
+                             retention['retention_rate'],
+                             'retention_rate', days, year, month))
                 
                 # Store advocacy metrics
-                self._store_metric('website', 'advocacy', 'Referrals',
-                                  int(advocacy.get('referral_sessions', 0)),
-                                  'referrals', days, year, month)
+                rows.append(('website', 'advocacy', 'Referrals',
+                             advocacy['referrals'],
+                             'referrals', days, year, month))
+                
+                self._store_metrics_batch(rows)
             
             print(f"  ✓ Stored {len(by_month)} months of website data")
             
         except Exception as e:
             print(f"  [ERROR] Website bulk collection failed: {e}")
-            import traceback
             traceback.print_exc()
     
-    def collect_email_bulk(self, start_month: datetime, end_month: datetime):
+    def collect_email_bulk(self, start_month: datetime, end_month: datetime,
+                           windows: List[MonthWindow] = None):
         """
         Collect email data for 12 months using aggregate analytics endpoint
         Makes 1 API call per month for aggregate metrics across all campaigns
+        
+        Args:
+            windows: Optional precomputed month windows (see _month_windows)
+                     covering start_month..end_month
         """
         email_creds = self.credentials.get('email', {})
         instantly_key = email_creds.get('instantly_api_key')
@@ -475,37 +666,66 @@ class DataCollector:
             return
 
         try:
-            fetcher = InstantlyFetcher(instantly_key)
+            fetcher = InstantlyFetcher(instantly_key, session=self._http)
 
             print(f"  Fetching email analytics from {start_month.strftime('%Y-%m')} to {end_month.strftime('%Y-%m')}")
 
             # Track all monthly data for summary
             all_monthly_data = {}
 
-            # Iterate through each month and get aggregate analytics
-            current_month = start_month
-            months_processed = 0
+            # Build the month windows up front so their fetches can overlap
+            if windows is not None:
+                months = list(windows)
+            else:
+                months = []
+                current_month = start_month
+                while current_month <= end_month:
+                    window = _month_window(current_month.year, current_month.month)
+                    months.append(window)
+
+                    # Move to next month
+                    current_month = window.end + timedelta(days=1)
+
+            # Months before this one have settled; keying by the API key's
+            # hash keeps a credential change from serving another account's data
+            settled_month = _first_unsettled_month(self._run_now)
+            key_hash = _token_key(instantly_key)[:16]
+
+            def fetch_month(window):
+                """Fetch aggregate analytics for one month (1 API call for all campaigns)"""
+                year, month, days = window.year, window.month, window.days
+                
+                # Settled months can't change, so reuse a previous run's response
+                closed = f"{year}-{month:02d}" < settled_month
+                cache_key = f"{self.customer_id}:email:{key_hash}:{year}-{month:02d}"
+                if closed and self.use_cache:
+                    cached = _EMAIL_CACHE.get(cache_key)
+                    if cached is not None:
+                        print(f"  [CACHE] Email analytics for {year}-{month:02d}")
+                        return cached
+                
+                analytics = fetcher.get_aggregate_analytics(
+                    start_date=f"{year}-{month:02d}-01",
+                    end_date=f"{year}-{month:02d}-{days:02d}",
+                    debug=False
+                )
+                
+                # An empty dict means the request failed; don't pin that
+                if closed and analytics:
+                    _EMAIL_CACHE.set(cache_key, analytics)
+                return analytics
 
-            while current_month <= end_month:
-                year = current_month.year
-                month = current_month.month
+            # Months are independent, so fetch them concurrently; results
+            # come back in month order for storage and the summary
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                monthly_analytics = list(executor.map(fetch_month, months))
 
-                # Calculate date range for this month
-                month_start = datetime(year, month, 1)
-                if month == 12:
-                    month_end = datetime(year + 1, 1, 1) - timedelta(days=1)
-                else:
-                    month_end = datetime(year, month + 1, 1) - timedelta(days=1)
+            months_processed = 0
 
+            for window, analytics in zip(months, monthly_analytics):
+                year, month, days = window.year, window.month, window.days
                 print(f"  Processing {year}-{month:02d}...")
 
-                # Fetch aggregate analytics for this month (1 API call for all campaigns)
-                analytics = fetcher.get_aggregate_analytics(
-                    start_date=month_start.strftime('%Y-%m-%d'),
-                    end_date=month_end.strftime('%Y-%m-%d'),
-                    debug=False
-                )
-
                 # Debug: Print what we got from the API
                 print(f"  API Response keys: {list(analytics.keys())}")
                 print(f"  emails_sent_count: {analytics.get('emails_sent_count', 'NOT FOUND')}")
@@ -531,30 +751,29 @@ class DataCollector:
                 # Calculate deliverability score
                 deliverability_score = (total_delivered / total_sent * 100) if total_sent > 0 else 0
 
-                # Calculate days in month
-                days = (month_end - month_start).days + 1
-
                 # Store metrics
+                rows = []
                 print(f"  Storing 'Emails Sent' with value: {total_sent}")
-                self._store_metric('email', 'awareness', 'Emails Sent',
-                                  total_sent, 'emails_sent', days, year, month)
+                rows.append(('email', 'awareness', 'Emails Sent',
+                             total_sent, 'emails_sent', days, year, month))
                 print(f"  Storing 'Emails Delivered' with value: {total_delivered}")
-                self._store_metric('email', 'awareness', 'Emails Delivered',
-                                  total_delivered, 'emails_delivered', days, year, month)
+                rows.append(('email', 'awareness', 'Emails Delivered',
+                             total_delivered, 'emails_delivered', days, year, month))
 
-                self._store_metric('email', 'engagement', 'Email Opens',
-                                  total_opened, 'email_opens', days, year, month)
-                self._store_metric('email', 'engagement', 'Email Clicks',
-                                  total_clicked, 'email_clicks', days, year, month)
+                rows.append(('email', 'engagement', 'Email Opens',
+                             total_opened, 'email_opens', days, year, month))
+                rows.append(('email', 'engagement', 'Email Clicks',
+                             total_clicked, 'email_clicks', days, year, month))
 
-                self._store_metric('email', 'response', 'Email Replies',
-                                  total_replied, 'email_replies', days, year, month)
+                rows.append(('email', 'response', 'Email Replies',
+                             total_replied, 'email_replies', days, year, month))
 
-                self._store_metric('email', 'retention', 'Unsubscribes',
-                                  total_unsubscribed, 'unsubscribes', days, year, month)
+                rows.append(('email', 'retention', 'Unsubscribes',
+                             total_unsubscribed, 'unsubscribes', days, year, month))
 
-                self._store_metric('email', 'quality', 'Deliverability Score',
-                                  deliverability_score, 'deliverability_score', days, year, month)
+                rows.append(('email', 'quality', 'Deliverability Score',
+                             deliverability_score, 'deliverability_score', days, year, month))
+                self._store_metrics_batch(rows)
 
                 # Store for summary
                 all_monthly_data[f"{year}-{month:02d}"] = {
@@ -569,20 +788,21 @@ class DataCollector:
 
                 months_processed += 1
 
-                # Move to next month
-                if month == 12:
-                    current_month = datetime(year + 1, 1, 1)
-                else:
-                    current_month = datetime(year, month + 1, 1)
-
             # Print comprehensive summary of all collected email data
-            print(f"\n{'='*70}")
+            print(f"\n{_SEPARATOR}")
             print(f"EMAIL DATA COLLECTION SUMMARY")
-            print(f"{'='*70}")
+            print(f"{_SEPARATOR}")
             print(f"Total months collected: {months_processed}")
             print(f"\nMonthly breakdown:")
+            total_sent_all = total_delivered_all = total_opened_all = 0
+            total_clicked_all = total_replied_all = 0
             for month_key in sorted(all_monthly_data.keys()):
                 data = all_monthly_data[month_key]
+                total_sent_all += data['sent']
+                total_delivered_all += data['delivered']
+                total_opened_all += data['opened']
+                total_clicked_all += data['clicked']
+                total_replied_all += data['replied']
                 print(f"\n  {month_key}:")
                 print(f"    Emails Sent:        {data['sent']:,}")
                 print(f"    Emails Delivered:   {data['delivered']:,}")
@@ -592,27 +812,19 @@ class DataCollector:
                 print(f"    Unsubscribed:       {data['unsubscribed']:,}")
                 print(f"    Deliverability:     {data['deliverability_score']:.1f}%")
 
-            # Calculate totals
-            total_sent_all = sum(d['sent'] for d in all_monthly_data.values())
-            total_delivered_all = sum(d['delivered'] for d in all_monthly_data.values())
-            total_opened_all = sum(d['opened'] for d in all_monthly_data.values())
-            total_clicked_all = sum(d['clicked'] for d in all_monthly_data.values())
-            total_replied_all = sum(d['replied'] for d in all_monthly_data.values())
-
-            print(f"\n{'='*70}")
+            print(f"\n{_SEPARATOR}")
             print(f"TOTALS ACROSS ALL MONTHS:")
             print(f"  Emails Sent:        {total_sent_all:,}")
             print(f"  Emails Delivered:   {total_delivered_all:,}")
             print(f"  Opened:             {total_opened_all:,}")
             print(f"  Clicked:            {total_clicked_all:,}")
             print(f"  Replied:            {total_replied_all:,}")
-            print(f"{'='*70}")
+            print(f"{_SEPARATOR}")
             print(f"  ✓ Stored {months_processed} months of email data")
-            print(f"{'='*70}\n")
+            print(f"{_SEPARATOR}\n")
             
         except Exception as e:
             print(f"  [ERROR] Email bulk collection failed: {e}")
-            import traceback
             traceback.print_exc()
     
     def collect_social_bulk(self, start_month: datetime, end_month: datetime):
@@ -628,7 +840,7 @@ class DataCollector:
             return
         
         try:
-            accounts = get_all_pages_and_instagram_accounts(system_token)
+            accounts = get_accounts_cached(system_token)
             
             if not accounts:
                 print("  [WARNING] No accounts found")
@@ -642,28 +854,56 @@ class DataCollector:
             # Initialize monthly buckets
             monthly_data = {}
             
+            # Accounts are independent, so fetch their Facebook and Instagram
+            # data concurrently; the aggregation below still runs in account order
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                fb_futures = [
+                    executor.submit(get_facebook_posts_engagement,
+                                    account.get('page_id'),
+                                    account.get('page_token'),
+                                    days_back=days_total)
+                    for account in accounts
+                ]
+                ig_futures = [
+                    executor.submit(get_instagram_account_insights,
+                                    account.get('instagram_id'),
+                                    account.get('page_token'),
+                                    days_back=days_total)
+                    if account.get('instagram_id') else None
+                    for account in accounts
+                ]
+            
             # For each account, get data with daily granularity
-            for account in accounts:
-                print(f"  Processing account: {account['page_name']}")
+            for account, fb_future, ig_future in zip(accounts, fb_futures, ig_futures):
+                page_name = account.get('page_name', 'unknown')
+                page_id = account.get('page_id')
+                page_token = account.get('page_token')
+                instagram_id = account.get('instagram_id')
+                fan_count = account.get('fan_count', 0) or 0
+                followers_count = account.get('followers_count', 0) or 0
+
+                print(f"  Processing account: {page_name}")
                 print(f'Triaging account: {json.dumps(account, indent=2)}')
                 
                 # Get Facebook post engagement data
                 try:
-                    fb_data = get_facebook_posts_engagement(
-                        account['page_id'],
-                        account['page_token'],
-                        days_back=days_total
-                    )
+                    fb_data = fb_future.result()
+
+                    fb_monthly = fb_data.get('monthly_data', _EMPTY)
 
                     # Debug: Show what we got from Facebook
-                    print(f"    [DEBUG] Facebook monthly_data keys: {list(fb_data.get('monthly_data', {}).keys())}")
-                    total_fb_reactions = sum(month_data.get('reactions', 0) for month_data in fb_data.get('monthly_data', {}).values())
-                    total_fb_comments = sum(month_data.get('comments', 0) for month_data in fb_data.get('monthly_data', {}).values())
-                    total_fb_shares = sum(month_data.get('shares', 0) for month_data in fb_data.get('monthly_data', {}).values())
-                    print(f"    [DEBUG] Facebook totals - Reactions: {total_fb_reactions}, Comments: {total_fb_comments}, Shares: {total_fb_shares}")
+                    print(f"    [DEBUG] Facebook monthly_data keys: {list(fb_monthly.keys())}")
+                    total_fb_reactions = total_fb_comments = total_fb_shares = 0
+
+                    # Aggregate Facebook data into monthly buckets, totalling as we go
+                    for month_str, month_data in fb_monthly.items():
+                        reactions = month_data.get('reactions', 0)
+                        comments = month_data.get('comments', 0)
+                        shares = month_data.get('shares', 0)
+                        total_fb_reactions += reactions
+                        total_fb_comments += comments
+                        total_fb_shares += shares
 
-                    # Aggregate Facebook data into monthly buckets
-                    for month_str, month_data in fb_data.get('monthly_data', {}).items():
                         # Parse month string "YYYY-MM"
                         year, month = map(int, month_str.split('-'))
                         month_key = (year, month)
@@ -677,28 +917,26 @@ class DataCollector:
                                 'followers': 0    # Page + Instagram followers
                             }
 
-                        monthly_data[month_key]['reactions'] += month_data.get('reactions', 0)
-                        monthly_data[month_key]['comments'] += month_data.get('comments', 0)
-                        monthly_data[month_key]['shares'] += month_data.get('shares', 0)
+                        bucket = monthly_data[month_key]
+                        bucket['reactions'] += reactions
+                        bucket['comments'] += comments
+                        bucket['shares'] += shares
+
+                    print(f"    [DEBUG] Facebook totals - Reactions: {total_fb_reactions}, Comments: {total_fb_comments}, Shares: {total_fb_shares}")
 
                     # Add follower count (point-in-time from page object)
                     for month_key in monthly_data:
-                        monthly_data[month_key]['followers'] += account.get('fan_count', 0)
+                        monthly_data[month_key]['followers'] += fan_count
 
                 except Exception as e:
-                    print(f"    [ERROR] Facebook failed for account {account.get('page_name', 'unknown')}: {e}")
-                    import traceback
+                    print(f"    [ERROR] Facebook failed for account {page_name}: {e}")
                     traceback.print_exc()
-                    print(f"    Account details: page_id={account.get('page_id')}, has_token={bool(account.get('page_token'))}")
+                    print(f"    Account details: page_id={page_id}, has_token={bool(page_token)}")
                 
                 # Get Instagram insights
-                if account.get('instagram_id'):
+                if instagram_id:
                     try:
-                        ig_insights = get_instagram_account_insights(
-                            account['instagram_id'],
-                            account['page_token'],
-                            days_back=days_total
-                        )
+                        ig_insights = ig_future.result()
 
                         # Debug: Show what we got from Instagram
                         print(f"    [DEBUG] Instagram insights keys: {list(ig_insights.keys())}")
@@ -709,14 +947,23 @@ class DataCollector:
 
                         # Parse reach data
                         if 'reach' in ig_insights:
+                            # Daily entries arrive in date order, so consecutive values
+                            # share a YYYY-MM prefix; only re-parse when it changes
+                            last_prefix = None
+                            last_key = None
+
                             for value_entry in ig_insights['reach']:
                                 date_str = value_entry.get('end_time', '')
                                 value = value_entry.get('value', 0)
 
                                 if date_str:
                                     try:
-                                        date_obj = datetime.strptime(date_str[:10], '%Y-%m-%d')
-                                        month_key = (date_obj.year, date_obj.month)
+                                        prefix = date_str[:7]
+                                        if prefix == last_prefix:
+                                            month_key = last_key
+                                        else:
+                                            month_key = (int(prefix[0:4]), int(prefix[5:7]))
+                                            last_prefix, last_key = prefix, month_key
 
                                         if month_key not in monthly_data:
                                             monthly_data[month_key] = {
@@ -758,59 +1005,60 @@ class DataCollector:
 
                         # Add Instagram follower count
                         for month_key in monthly_data:
-                            monthly_data[month_key]['followers'] += account.get('followers_count', 0)
+                            monthly_data[month_key]['followers'] += followers_count
                         
                     except Exception as e:
-                        print(f"    [ERROR] Instagram failed for account {account.get('page_name', 'unknown')}: {e}")
-                        import traceback
+                        print(f"    [ERROR] Instagram failed for account {page_name}: {e}")
                         traceback.print_exc()
-                        print(f"    Account details: instagram_id={account.get('instagram_id')}, has_token={bool(account.get('page_token'))}")
+                        print(f"    Account details: instagram_id={instagram_id}, has_token={bool(page_token)}")
             
+            # Sort once and reuse for both the storage and summary passes
+            sorted_months = sorted(monthly_data.items())
+
             # Store monthly aggregated data
-            for (year, month), data in monthly_data.items():
+            for (year, month), data in sorted_months:
                 print(f"  Storing {year}-{month:02d}...")
                 
                 # Calculate days in month
-                if month == 12:
-                    next_month = datetime(year + 1, 1, 1)
-                else:
-                    next_month = datetime(year, month + 1, 1)
-                month_start = datetime(year, month, 1)
-                days = (next_month - month_start).days
+                days = calendar.monthrange(year, month)[1]
                 
                 # Store metrics mapped to journey stages
+                rows = []
+                
                 # AWARENESS: Reach from Instagram
                 print(f"    Storing Reach: {data.get('reach', 0)}")
-                self._store_metric('social_media', 'awareness', 'Reach',
-                                  data.get('reach', 0), 'reach', days, year, month)
+                rows.append(('social_media', 'awareness', 'Reach',
+                             data.get('reach', 0), 'reach', days, year, month))
 
                 # ENGAGEMENT: Post reactions (Facebook)
                 print(f"    Storing Reactions: {data.get('reactions', 0)}")
-                self._store_metric('social_media', 'engagement', 'Reactions',
-                                  data.get('reactions', 0), 'reactions', days, year, month)
+                rows.append(('social_media', 'engagement', 'Reactions',
+                             data.get('reactions', 0), 'reactions', days, year, month))
 
                 # CONVERSION: Post comments (Facebook) - interactions that lead to engagement
                 print(f"    Storing Comments: {data.get('comments', 0)}")
-                self._store_metric('social_media', 'conversion', 'Comments',
-                                  data.get('comments', 0), 'comments', days, year, month)
+                rows.append(('social_media', 'conversion', 'Comments',
+                             data.get('comments', 0), 'comments', days, year, month))
 
                 # ADVOCACY: Post shares (Facebook)
                 print(f"    Storing Shares: {data.get('shares', 0)}")
-                self._store_metric('social_media', 'advocacy', 'Shares',
-                                  data.get('shares', 0), 'shares', days, year, month)
+                rows.append(('social_media', 'advocacy', 'Shares',
+                             data.get('shares', 0), 'shares', days, year, month))
 
                 # RETENTION: Follower count (Facebook + Instagram)
                 print(f"    Storing Followers: {data.get('followers', 0)}")
-                self._store_metric('social_media', 'retention', 'Followers',
-                                  data.get('followers', 0), 'followers', days, year, month)
+                rows.append(('social_media', 'retention', 'Followers',
+                             data.get('followers', 0), 'followers', days, year, month))
+                
+                self._store_metrics_batch(rows)
 
             # Print comprehensive summary of all collected data
-            print(f"\n{'='*70}")
+            print(f"\n{_SEPARATOR}")
             print(f"SOCIAL MEDIA DATA COLLECTION SUMMARY")
-            print(f"{'='*70}")
+            print(f"{_SEPARATOR}")
             print(f"Total months collected: {len(monthly_data)}")
             print(f"\nMonthly breakdown:")
-            for (year, month), data in sorted(monthly_data.items()):
+            for (year, month), data in sorted_months:
                 print(f"\n  {year}-{month:02d}:")
                 print(f"    Reach:     {data.get('reach', 0):,}")
                 print(f"    Reactions: {data.get('reactions', 0):,}")
@@ -818,80 +1066,161 @@ class DataCollector:
                 print(f"    Shares:    {data.get('shares', 0):,}")
                 print(f"    Followers: {data.get('followers', 0):,}")
 
-            print(f"\n{'='*70}")
+            print(f"\n{_SEPARATOR}")
             print(f"  ✓ Stored {len(monthly_data)} months of social media data")
-            print(f"{'='*70}\n")
+            print(f"{_SEPARATOR}\n")
             
         except Exception as e:
             print(f"  [ERROR] Social bulk collection failed: {e}")
-            import traceback
+            # Page tokens may have been revoked; rediscover on the next run
+            invalidate_accounts_cache(system_token)
             traceback.print_exc()
     
     # Keep existing methods for current period collection
     def collect_social_media(self, days: int):
         """Collect and store social media metrics for current period"""
-        now = datetime.now()
+        now = self._run_now
         start = now - timedelta(days=days)
         self.collect_social_bulk(start, now)
     
     def collect_email_metrics(self, days: int):
         """Collect and store email metrics for current period"""
-        now = datetime.now()
+        now = self._run_now
         start = now - timedelta(days=days)
         self.collect_email_bulk(start, now)
     
     def collect_website_metrics(self, days: int):
         """Collect and store website metrics for current period"""
-        now = datetime.now()
+        now = self._run_now
         start = now - timedelta(days=days)
         self.collect_website_bulk(start, now)
     
+    @functools.cached_property
+    def _history_windows(self) -> List[MonthWindow]:
+        """The 12 month windows used by historical collection, computed once"""
+        return self._month_windows(12)
+    
+    def _month_windows(self, n: int = 12) -> List[MonthWindow]:
+        """Calendar months ending with the run's current month, oldest first"""
+        year, month = self._run_now.year, self._run_now.month
+        windows = []
+        for _ in range(n):
+            windows.append(_month_window(year, month))
+            month -= 1
+            if month == 0:
+                month = 12
+                year -= 1
+        windows.reverse()
+        return windows
+    
     def _store_metric(self, medium: str, journey_stage: str, kpi_name: str,
                      kpi_value: float, benchmark_key: str, time_period_days: int,
                      year: int = None, month: int = None):
-        """Store a metric with its benchmark for a specific month"""
+        """Queue a metric with its benchmark for a specific month (see flush_metrics)"""
         # Get benchmark
-        benchmark = get_benchmark(
-            self.customer['industry'],
-            medium,
-            journey_stage,
-            benchmark_key
-        )
+        bench_key = (medium, journey_stage, benchmark_key)
+        benchmark = self._bench_cache.get(bench_key)
+        if benchmark is None:
+            benchmark = self._bench_cache[bench_key] = get_benchmark(self._industry, *bench_key)
 
         # Debug output
         print(f"      [STORE] {medium}/{journey_stage}/{kpi_name} = {kpi_value} (year={year}, month={month})")
 
-        # Store in database with year/month
-        HistoricalMetric.add(
-            self.customer_id,
-            medium,
-            journey_stage,
-            kpi_name,
-            kpi_value,
-            benchmark,
-            time_period_days,
-            year,
-            month
-        )
+        # Buffer for a single batched write with year/month
+        try:
+            buf = self._tls.buf
+        except AttributeError:
+            buf = self._tls.buf = []
+            with self._metrics_lock:
+                self._all_bufs.append(buf)
+        buf.append((medium, journey_stage, kpi_name, kpi_value, benchmark, time_period_days, year, month))
+    
+    def _store_metrics_batch(self, rows: List[tuple]):
+        """
+        Queue several metrics at once
+        
+        Args:
+            rows: Tuples of (medium, journey_stage, kpi_name, kpi_value,
+                  benchmark_key, time_period_days, year, month), i.e. the
+                  _store_metric arguments
+        """
+        for row in rows:
+            self._store_metric(*row)
+    
+    def flush_metrics(self):
+        """Write all queued metrics to the database in batched commits"""
+        with self._metrics_lock:
+            bufs = list(self._all_bufs)
+        
+        def drain():
+            # Stream only what each buffer held when we reached it; a thread
+            # still appending just leaves its newer records for the next flush
+            for buf in bufs:
+                count = len(buf)
+                yield from itertools.islice(buf, count)
+                del buf[:count]
+        
+        written = HistoricalMetric.add_many(self.customer_id, drain())
+        if written:
+            print(f"[INFO] Flushed {written} metrics for {self.customer_id}")
 
 
-def main():
-    """Main execution"""
-    import argparse
+def _parse_args(argv: List[str]):
+    """
+    Parse command line arguments
+    
+    The common scheduled invocation (--customer-id X --days N) is parsed
+    directly; anything else goes through the argparse parser, which is only
+    built then.
+    """
+    if len(argv) == 4 and argv[0] == '--customer-id' and argv[2] == '--days':
+        try:
+            days = int(argv[3])
+        except ValueError:
+            pass  # Let argparse report the bad value
+        else:
+            return SimpleNamespace(customer_id=[argv[1]], days=days, history=False,
+                                   max_workers=8, no_cache=False)
     
     parser = argparse.ArgumentParser(description='Collect data for customer dashboard')
-    parser.add_argument('--customer-id', type=str, required=True, help='Customer ID')
+    parser.add_argument('--customer-id', type=str, nargs='+', required=True,
+                        help='Customer ID (pass several to collect them in one run)')
     parser.add_argument('--days', type=int, default=30, help='Days of data to collect')
     parser.add_argument('--history', action='store_true', help='Collect 12 months of historical data')
+    parser.add_argument('--max-workers', type=int, default=8, help='Max concurrent API requests per source')
+    parser.add_argument('--no-cache', action='store_true', help='Re-fetch closed months instead of using the disk cache')
     
-    args = parser.parse_args()
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main execution"""
+    args = _parse_args(sys.argv[1:])
     
     # Initialize database if needed
     Database.init_db()
     
-    # Collect data
-    collector = DataCollector(args.customer_id)
-    collector.collect_all_data(days=args.days, collect_history=args.history)
+    # Collect data, sharing one HTTP session (and the module-level caches)
+    # across customers instead of starting a process per customer
+    session = make_http_session()
+    for customer_id in args.customer_id:
+        collector = None
+        try:
+            collector = DataCollector(customer_id, max_workers=args.max_workers,
+                                      use_cache=not args.no_cache, session=session)
+            collector.collect_all_data(days=args.days, collect_history=args.history)
+        except Exception as e:
+            print(f"[ERROR] Collection failed for customer {customer_id}: {e}")
+            traceback.print_exc()
+        finally:
+            # collect_all_data flushes on success; this saves whatever the
+            # sources queued before a failure
+            if collector is not None:
+                try:
+                    collector.flush_metrics()
+                except Exception as e:
+                    print(f"[ERROR] Could not save metrics for customer {customer_id}: {e}")
+                    traceback.print_exc()
 
 
 if __name__ == '__main__':
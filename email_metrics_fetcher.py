@@ -11,35 +11,146 @@ Customer Journey Stages Tracked:
 5. Quality - Bounces, spam complaints, deliverability
 """
 
+import concurrent.futures
+import heapq
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
+import time
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib decoder
+    orjson = None
+
+# Upper bound on simultaneous API requests when fanning out per campaign/metric
+# (matches the shared session's per-host pool size)
+MAX_CONCURRENT_REQUESTS = 20
+
+# Campaign IDs sent per batched analytics request
+CAMPAIGN_BATCH_SIZE = 50
+
+# Default keep-alive session shared by every fetcher, so repeated calls reuse
+# one TLS connection per host and throttled/5xx responses are retried.
+# Auth headers stay per request because fetchers for different API keys
+# share it.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=MAX_CONCURRENT_REQUESTS,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504])
+)
+_SESSION.mount('https://', _ADAPTER)
+
+# Compressed encodings this install can decode: gzip/deflate always, plus
+# br (Brotli) when the brotli or brotlicffi package is present
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+# Seconds a campaign list / metric catalog stays fresh; both change on the
+# order of hours, not between the calls made for a single report
+CAMPAIGNS_TTL = 300
+METRICS_LIST_TTL = 3600
+
+# Aggregate analytics for a range that has fully closed no longer change;
+# a range that includes today is refreshed every few minutes. Empty/error
+# replies are held briefly so an outage isn't hammered on every refresh.
+AGGREGATE_CLOSED_TTL = 24 * 3600
+AGGREGATE_OPEN_TTL = 300
+NEGATIVE_TTL = 30
+
+
+def _json(response):
+    """Decode an API response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _cached(cache: Dict, key: str, ttl: float, fn, negative_ttl: float = 0):
+    """
+    Return cache[key] if younger than ttl seconds, otherwise call fn and
+    store its result. Empty results (the fetchers' error value) are only
+    kept for negative_ttl seconds, so by default a failed request is
+    retried on the next call.
+    """
+    now = time.monotonic()
+    hit = cache.get(key)
+    if hit and now - hit[0] < (ttl if hit[1] else negative_ttl):
+        return hit[1]
+    value = fn()
+    if value or negative_ttl:
+        cache[key] = (now, value)
+    return value
+
+# Per-campaign fields summed into the journey totals:
+# (campaign row key, Instantly analytics field, totals key).
+# 'delivered' is handled separately because it falls back to the sent count
+_CAMPAIGN_FIELDS = (
+    ('sent', 'emails_sent_count', 'total_sent'),
+    ('opened', 'open_count_unique', 'total_opened'),  # Use unique opens
+    ('clicked', 'link_click_count_unique', 'total_clicked'),  # Use unique clicks
+    ('replied', 'reply_count_unique', 'total_replied'),  # Use unique replies
+    ('bounced', 'bounced_count', 'total_bounced'),
+    ('unsubscribed', 'unsubscribed_count', 'total_unsubscribed'),
+    ('leads', 'new_leads_contacted_count', 'total_leads'),
+    # Bonus Instantly-specific metrics
+    ('opportunities', 'total_opportunities', 'total_opportunities'),
+    ('interested', 'total_interested', 'total_interested'),
+    ('meetings_booked', 'total_meeting_booked', 'total_meetings_booked'),
+    ('meetings_completed', 'total_meeting_completed', 'total_meetings_completed'),
+    ('closed', 'total_closed', 'total_closed'),
+)
+_CAMPAIGN_ROW_KEYS = tuple(f[0] for f in _CAMPAIGN_FIELDS)
+_CAMPAIGN_SOURCE_FIELDS = tuple(f[1] for f in _CAMPAIGN_FIELDS)
+
+
+def _pct(part, whole) -> float:
+    """part as a percentage of whole, rounded to 2 places (0 when whole is 0)"""
+    return round(part / whole * 100, 2) if whole > 0 else 0
+
+
+def _measure_total(value) -> int:
+    """Klaviyo measurements are either a per-interval list or a single value"""
+    return sum(value) if isinstance(value, list) else value
 
 
 class InstantlyFetcher:
     """Fetch email metrics from Instantly.ai API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: requests.Session = None):
         self.api_key = api_key
         self.base_url = "https://api.instantly.ai/api/v2"
+        # Defaults to the module-wide pooled session
+        self.session = session or _SESSION
+        # key -> (monotonic timestamp, value), see _cached
+        self._cache: Dict[str, tuple] = {}
+        # Account analytics endpoint that last answered, tried first next time
+        self._account_endpoint: Optional[str] = None
         self.headers = {
             "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING
         }
     
     def get_all_campaigns(self) -> List[Dict]:
-        """Get all campaigns with complete metrics"""
+        """Get all campaigns with complete metrics (cached for CAMPAIGNS_TTL seconds)"""
+        return _cached(self._cache, 'campaigns', CAMPAIGNS_TTL, self._fetch_all_campaigns)
+    
+    def _fetch_all_campaigns(self) -> List[Dict]:
         print("[INFO] Fetching Instantly campaigns...")
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/campaigns",
                 headers=self.headers
             )
             response.raise_for_status()
-            data = response.json()
+            data = _json(response)
             
             # Debug: Show response structure
             print(f"[DEBUG] API response type: {type(data)}")
@@ -69,7 +180,12 @@ class InstantlyFetcher:
                 if isinstance(campaigns[0], dict):
                     print(f"[DEBUG] First campaign keys: {list(campaigns[0].keys())}")
             
-            return campaigns
+            # Keep only the fields the report reads so the cached list stays small
+            return [
+                {'id': c.get('id'), 'name': c.get('name'), 'status': c.get('status')}
+                if isinstance(c, dict) else c
+                for c in campaigns
+            ]
             
         except Exception as e:
             print(f"[ERROR] Failed to fetch campaigns: {e}")
@@ -89,6 +205,15 @@ class InstantlyFetcher:
 
         Returns: Dictionary with aggregated metrics across all campaigns
         """
+        closed = end_date < datetime.now().strftime('%Y-%m-%d')
+        return _cached(
+            self._cache, f"aggregate:{start_date}:{end_date}",
+            AGGREGATE_CLOSED_TTL if closed else AGGREGATE_OPEN_TTL,
+            lambda: self._fetch_aggregate_analytics(start_date, end_date, debug),
+            negative_ttl=NEGATIVE_TTL
+        )
+
+    def _fetch_aggregate_analytics(self, start_date: str, end_date: str, debug: bool = False) -> Dict:
         endpoint = f"{self.base_url}/campaigns/analytics"
         params = {
             'start_date': start_date,
@@ -105,9 +230,9 @@ class InstantlyFetcher:
                 print(f"[DEBUG] Endpoint: {endpoint}")
                 print(f"[DEBUG] Params: {params}")
 
-            response = requests.get(endpoint, headers=self.headers, params=params)
+            response = self.session.get(endpoint, headers=self.headers, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = _json(response)
 
             if debug:
                 print(f"[DEBUG] Success!")
@@ -155,13 +280,11 @@ class InstantlyFetcher:
 
     def get_campaign_analytics(self, campaign_id: str, start_date: str = None, end_date: str = None, debug: bool = False) -> Dict:
         """Get detailed analytics for a specific campaign"""
-        from datetime import datetime, timedelta
-        
         # Default to last 30 days if not specified
-        if not end_date:
-            end_date = datetime.now().strftime('%Y-%m-%d')
-        if not start_date:
-            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        if not (start_date and end_date):
+            now = datetime.now()
+            end_date = end_date or now.strftime('%Y-%m-%d')
+            start_date = start_date or (now - timedelta(days=30)).strftime('%Y-%m-%d')
         
         endpoint = f"{self.base_url}/campaigns/analytics/overview"
         params = {
@@ -176,9 +299,9 @@ class InstantlyFetcher:
                 print(f"[DEBUG] Endpoint: {endpoint}")
                 print(f"[DEBUG] Params: {params}")
             
-            response = requests.get(endpoint, headers=self.headers, params=params)
+            response = self.session.get(endpoint, headers=self.headers, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = _json(response)
             
             if debug:
                 print(f"[DEBUG] Success!")
@@ -196,21 +319,24 @@ class InstantlyFetcher:
             return {}
     
     def get_multiple_campaigns_analytics(self, campaign_ids: list, start_date: str = None, end_date: str = None, debug: bool = False) -> Dict:
-        """Get analytics for multiple campaigns at once (more efficient)"""
-        from datetime import datetime, timedelta
-        
+        """
+        Get analytics for multiple campaigns at once (more efficient)
+
+        Uses /campaigns/analytics, which answers with one entry per campaign;
+        /campaigns/analytics/overview would merge them into a single dict
+        """
         # Default to last 30 days if not specified
-        if not end_date:
-            end_date = datetime.now().strftime('%Y-%m-%d')
-        if not start_date:
-            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        if not (start_date and end_date):
+            now = datetime.now()
+            end_date = end_date or now.strftime('%Y-%m-%d')
+            start_date = start_date or (now - timedelta(days=30)).strftime('%Y-%m-%d')
         
-        endpoint = f"{self.base_url}/campaigns/analytics/overview"
+        endpoint = f"{self.base_url}/campaigns/analytics"
         params = {
-            'ids': ','.join(campaign_ids),  # Multiple IDs comma-separated
+            'ids': list(campaign_ids),  # Sent as repeated ids= parameters
             'start_date': start_date,
             'end_date': end_date,
-            'expand_crm_events': 'true'
+            'exclude_total_leads_count': 'true'
         }
         
         try:
@@ -219,15 +345,15 @@ class InstantlyFetcher:
                 print(f"[DEBUG] Endpoint: {endpoint}")
                 print(f"[DEBUG] Params: {params}")
             
-            response = requests.get(endpoint, headers=self.headers, params=params)
+            response = self.session.get(endpoint, headers=self.headers, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = _json(response)
             
             if debug:
                 print(f"[DEBUG] Success!")
                 print(f"[DEBUG] Response type: {type(data)}")
-                if isinstance(data, dict):
-                    print(f"[DEBUG] Response keys: {list(data.keys())}")
+                if isinstance(data, list):
+                    print(f"[DEBUG] Response is list with {len(data)} items")
             
             return data
             
@@ -247,15 +373,19 @@ class InstantlyFetcher:
             f"{self.base_url}/account/analytics",
             f"{self.base_url}/analytics/summary"
         ]
+        if self._account_endpoint:
+            possible_endpoints.remove(self._account_endpoint)
+            possible_endpoints.insert(0, self._account_endpoint)
+            self._account_endpoint = None
         
         for endpoint in possible_endpoints:
             try:
                 if debug:
                     print(f"[DEBUG] Trying endpoint: {endpoint}")
                 
-                response = requests.get(endpoint, headers=self.headers)
+                response = self.session.get(endpoint, headers=self.headers)
                 response.raise_for_status()
-                data = response.json()
+                data = _json(response)
                 
                 if debug:
                     print(f"[DEBUG] Success! Endpoint works: {endpoint}")
@@ -263,6 +393,7 @@ class InstantlyFetcher:
                     if isinstance(data, dict):
                         print(f"[DEBUG] Response keys: {list(data.keys())}")
                 
+                self._account_endpoint = endpoint
                 return data
                 
             except Exception as e:
@@ -273,53 +404,19 @@ class InstantlyFetcher:
         print(f"[ERROR] All analytics endpoints failed")
         return {}
     
-    def calculate_customer_journey_metrics(self, days: int = 30, debug: bool = False) -> Dict:
+    def _collect_campaign_totals(self, campaigns: List, totals: Dict, start_date: str,
+                                 end_date: str, debug: bool = False) -> List[Dict]:
         """
-        Calculate comprehensive customer journey metrics from Instantly data
-        Returns metrics organized by journey stage
+        Fetch per-campaign analytics, add them into totals and return the
+        per-campaign rows (used for the top campaign ranking)
         """
-        from datetime import datetime, timedelta
-        
-        print("\n" + "="*70)
-        print("INSTANTLY.AI - CUSTOMER JOURNEY METRICS")
-        print("="*70)
-        
-        # Calculate date range
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-        
-        print(f"[INFO] Date range: {start_date} to {end_date}")
-        
-        campaigns = self.get_all_campaigns()
-        
-        if not campaigns:
-            print("[WARNING] No campaign data available")
-            return {}
-        
-        print(f"[INFO] Fetching analytics for {len(campaigns)} campaigns...")
-        
-        # Initialize totals
-        totals = {
-            'total_sent': 0,
-            'total_delivered': 0,
-            'total_opened': 0,
-            'total_clicked': 0,
-            'total_replied': 0,
-            'total_bounced': 0,
-            'total_unsubscribed': 0,
-            'total_leads': 0,
-            'total_completed': 0,
-            # Instantly-specific sales pipeline metrics
-            'total_opportunities': 0,
-            'total_interested': 0,
-            'total_meetings_booked': 0,
-            'total_meetings_completed': 0,
-            'total_closed': 0
-        }
-        
         campaign_list = []
+        field_sums = [0] * len(_CAMPAIGN_FIELDS)
+        delivered_sum = 0
+        completed = 0
         
-        # Fetch analytics for each campaign
+        # Collect the campaigns we can fetch analytics for
+        to_fetch = []
         for idx, campaign in enumerate(campaigns):
             # Skip if campaign is not a dict
             if not isinstance(campaign, dict):
@@ -333,68 +430,178 @@ class InstantlyFetcher:
                 print(f"[WARNING] Skipping campaign without ID: {campaign_name}")
                 continue
             
-            print(f"[{idx+1}/{len(campaigns)}] Fetching analytics for: {campaign_name}")
+            to_fetch.append((idx, campaign, campaign_id, campaign_name))
+        
+        def fetch(item):
+            idx, campaign, campaign_id, campaign_name = item
             
             # Get campaign analytics with date range
-            analytics = self.get_campaign_analytics(
+            return self.get_campaign_analytics(
                 campaign_id, 
                 start_date=start_date, 
                 end_date=end_date,
                 debug=(debug and idx == 0)
             )
-            
+        
+        # Ask for campaigns in batches first; /campaigns/analytics returns a
+        # list of per-campaign entries, saving one request per campaign. An
+        # entry is only used if it carries every field _CAMPAIGN_FIELDS reads
+        # (the unique and CRM counts come from the overview endpoint with
+        # expand_crm_events), so incomplete entries never count as zeros
+        analytics_by_id = {}
+        campaign_ids = [item[2] for item in to_fetch]
+        for offset in range(0, len(campaign_ids), CAMPAIGN_BATCH_SIZE):
+            batch_ids = campaign_ids[offset:offset + CAMPAIGN_BATCH_SIZE]
+            print(f"[INFO] Fetching analytics for campaigns {offset+1}-{offset+len(batch_ids)} of {len(campaign_ids)} in one call")
+            batch = self.get_multiple_campaigns_analytics(
+                batch_ids,
+                start_date=start_date,
+                end_date=end_date,
+                debug=(debug and offset == 0)
+            )
+            if isinstance(batch, list):
+                for entry in batch:
+                    if isinstance(entry, dict):
+                        entry_id = entry.get('campaign_id') or entry.get('id')
+                        if entry_id and all(entry.get(field) is not None
+                                            for field in _CAMPAIGN_SOURCE_FIELDS):
+                            analytics_by_id[entry_id] = entry
+        
+        # Anything missing or incomplete in the batch replies is fetched
+        # individually from the overview endpoint. These
+        # requests are independent, so issue them concurrently (capped to
+        # stay within Instantly's rate limits)
+        missing = [item for item in to_fetch if item[2] not in analytics_by_id]
+        if missing:
+            print(f"[INFO] Fetching {len(missing)} campaigns individually")
+            # One write for the whole progress listing, rather than a print
+            # per worker thread interleaving on stdout
+            print("\n".join(
+                f"[{idx+1}/{len(campaigns)}] Fetching analytics for: {campaign_name}"
+                for idx, _, _, campaign_name in missing
+            ))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                for item, analytics in zip(missing, executor.map(fetch, missing)):
+                    analytics_by_id[item[2]] = analytics
+        
+        no_data = []
+        for idx, campaign, campaign_id, campaign_name in to_fetch:
+            analytics = analytics_by_id.get(campaign_id)
             if not analytics:
-                if debug:
-                    print(f"[WARNING] No analytics data for campaign: {campaign_name}")
+                no_data.append(campaign_name)
                 continue
             
             # Extract metrics from analytics response using Instantly's actual field names
+            values = [analytics.get(field, 0) for _, field, _ in _CAMPAIGN_FIELDS]
+            delivered = analytics.get('contacted_count', values[0])
+            
             campaign_data = {
                 'id': campaign_id,
                 'name': campaign_name,
                 'status': campaign.get('status', 'unknown'),
-                'sent': analytics.get('emails_sent_count', 0),
-                'delivered': analytics.get('contacted_count', analytics.get('emails_sent_count', 0)),
-                'opened': analytics.get('open_count_unique', 0),  # Use unique opens
-                'clicked': analytics.get('link_click_count_unique', 0),  # Use unique clicks
-                'replied': analytics.get('reply_count_unique', 0),  # Use unique replies
-                'bounced': analytics.get('bounced_count', 0),
-                'unsubscribed': analytics.get('unsubscribed_count', 0),
-                'leads': analytics.get('new_leads_contacted_count', 0),
-                # Bonus Instantly-specific metrics
-                'opportunities': analytics.get('total_opportunities', 0),
-                'interested': analytics.get('total_interested', 0),
-                'meetings_booked': analytics.get('total_meeting_booked', 0),
-                'meetings_completed': analytics.get('total_meeting_completed', 0),
-                'closed': analytics.get('total_closed', 0)
+                'delivered': delivered,
             }
+            campaign_data.update(zip(_CAMPAIGN_ROW_KEYS, values))
             
             if debug and idx == 0:
                 print(f"[DEBUG] Extracted campaign data: {campaign_data}")
             
-            # Add to totals
-            totals['total_sent'] += campaign_data['sent']
-            totals['total_delivered'] += campaign_data['delivered']
-            totals['total_opened'] += campaign_data['opened']
-            totals['total_clicked'] += campaign_data['clicked']
-            totals['total_replied'] += campaign_data['replied']
-            totals['total_bounced'] += campaign_data['bounced']
-            totals['total_unsubscribed'] += campaign_data['unsubscribed']
-            totals['total_leads'] += campaign_data['leads']
-            totals['total_opportunities'] += campaign_data.get('opportunities', 0)
-            totals['total_interested'] += campaign_data.get('interested', 0)
-            totals['total_meetings_booked'] += campaign_data.get('meetings_booked', 0)
-            totals['total_meetings_completed'] += campaign_data.get('meetings_completed', 0)
-            totals['total_closed'] += campaign_data.get('closed', 0)
+            # Accumulate locally; totals is written once after the loop
+            for i, value in enumerate(values):
+                field_sums[i] += value
+            delivered_sum += delivered
             
             if campaign.get('status') == 'completed':
-                totals['total_completed'] += 1
+                completed += 1
             
             campaign_list.append(campaign_data)
         
+        if debug and no_data:
+            print("\n".join(f"[WARNING] No analytics data for campaign: {name}" for name in no_data))
+        
+        for (_, _, total_key), value in zip(_CAMPAIGN_FIELDS, field_sums):
+            totals[total_key] += value
+        totals['total_delivered'] += delivered_sum
+        totals['total_completed'] += completed
+        
+        return campaign_list
+    
+    def calculate_customer_journey_metrics(self, days: int = 30, debug: bool = False,
+                                           aggregate_only: bool = False) -> Dict:
+        """
+        Calculate comprehensive customer journey metrics from Instantly data
+        Returns metrics organized by journey stage
+        
+        Args:
+            days: Number of days to report on
+            debug: Enable debug logging
+            aggregate_only: Use one aggregate analytics call instead of
+                            per-campaign requests; top_campaigns is left empty
+        """
+        
+        print("\n" + "="*70)
+        print("INSTANTLY.AI - CUSTOMER JOURNEY METRICS")
+        print("="*70)
+        
+        # Calculate date range
+        now = datetime.now()
+        end_date = now.strftime('%Y-%m-%d')
+        start_date = (now - timedelta(days=days)).strftime('%Y-%m-%d')
+        
+        print(f"[INFO] Date range: {start_date} to {end_date}")
+        
+        campaigns = self.get_all_campaigns()
+        
+        if not campaigns:
+            print("[WARNING] No campaign data available")
+            return {}
+        
+        print(f"[INFO] Fetching analytics for {len(campaigns)} campaigns...")
+        
+        # Initialize totals
+        totals = {
+            'total_sent': 0,
+            'total_delivered': 0,
+            'total_opened': 0,
+            'total_clicked': 0,
+            'total_replied': 0,
+            'total_bounced': 0,
+            'total_unsubscribed': 0,
+            'total_leads': 0,
+            'total_completed': 0,
+            # Instantly-specific sales pipeline metrics
+            'total_opportunities': 0,
+            'total_interested': 0,
+            'total_meetings_booked': 0,
+            'total_meetings_completed': 0,
+            'total_closed': 0
+        }
+        
+        if aggregate_only:
+            # One server-side aggregate instead of a request per campaign
+            campaign_list = []
+            analytics = self.get_aggregate_analytics(start_date, end_date, debug=debug)
+            totals['total_sent'] = analytics.get('emails_sent_count', 0)
+            totals['total_delivered'] = analytics.get('contacted_count', analytics.get('emails_sent_count', 0))
+            totals['total_opened'] = analytics.get('open_count_unique', 0)
+            totals['total_clicked'] = analytics.get('link_click_count_unique', 0)
+            totals['total_replied'] = analytics.get('reply_count_unique', 0)
+            totals['total_bounced'] = analytics.get('bounced_count', 0)
+            totals['total_unsubscribed'] = analytics.get('unsubscribed_count', 0)
+            totals['total_leads'] = analytics.get('new_leads_contacted_count', 0)
+            totals['total_opportunities'] = analytics.get('total_opportunities', 0)
+            totals['total_interested'] = analytics.get('total_interested', 0)
+            totals['total_meetings_booked'] = analytics.get('total_meeting_booked', 0)
+            totals['total_meetings_completed'] = analytics.get('total_meeting_completed', 0)
+            totals['total_closed'] = analytics.get('total_closed', 0)
+            totals['total_completed'] = sum(1 for c in campaigns if isinstance(c, dict) and c.get('status') == 'completed')
+        else:
+            campaign_list = self._collect_campaign_totals(campaigns, totals, start_date, end_date, debug)
+        
         # Calculate rates
         sent = totals['total_sent']
         delivered = totals['total_delivered']
+        active_count = sum(1 for c in campaigns if isinstance(c, dict) and c.get('status') == 'active')
         
         metrics = {
             # STAGE 1: AWARENESS (How many people did we reach?)
@@ -419,15 +626,15 @@ class InstantlyFetcher:
             
             # STAGE 5: QUALITY (How healthy is our email program?)
             'quality': {
-                'deliverability_score': round((delivered / sent * 100) if sent > 0 else 0, 2),
+                'deliverability_score': _pct(delivered, sent),
             },
             
             # CAMPAIGN PERFORMANCE
             'campaigns': {
                 'total_campaigns': len(campaigns),
-                'active_campaigns': len([c for c in campaigns if c.get('status') == 'active']),
+                'active_campaigns': active_count,
                 'completed_campaigns': totals['total_completed'],
-                'top_campaigns': sorted(campaign_list, key=lambda x: x['replied'], reverse=True)[:5]
+                'top_campaigns': heapq.nlargest(5, campaign_list, key=lambda x: x['replied'])
             },
             
             # SALES PIPELINE (Instantly-specific)
@@ -437,8 +644,8 @@ class InstantlyFetcher:
                 'meetings_booked': totals['total_meetings_booked'],
                 'meetings_completed': totals['total_meetings_completed'],
                 'deals_closed': totals['total_closed'],
-                'meeting_show_rate': round((totals['total_meetings_completed'] / totals['total_meetings_booked'] * 100) if totals['total_meetings_booked'] > 0 else 0, 2),
-                'close_rate': round((totals['total_closed'] / totals['total_leads'] * 100) if totals['total_leads'] > 0 else 0, 2)
+                'meeting_show_rate': _pct(totals['total_meetings_completed'], totals['total_meetings_booked']),
+                'close_rate': _pct(totals['total_closed'], totals['total_leads'])
             }
         }
         
@@ -448,48 +655,64 @@ class InstantlyFetcher:
 class KlaviyoFetcher:
     """Fetch email metrics from Klaviyo API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: requests.Session = None):
         self.api_key = api_key
         self.base_url = "https://a.klaviyo.com/api"
+        # Defaults to the module-wide pooled session
+        self.session = session or _SESSION
+        # key -> (monotonic timestamp, value), see _cached
+        self._cache: Dict[str, tuple] = {}
         self.headers = {
             "Authorization": f"Klaviyo-API-Key {api_key}",
             "Accept": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
             "revision": "2025-10-15"
         }
     
     def get_metrics_list(self) -> List[Dict]:
-        """Get all available metrics in the account"""
+        """Get all available metrics in the account (cached for METRICS_LIST_TTL seconds)"""
+        return _cached(self._cache, 'metrics', METRICS_LIST_TTL, self._fetch_metrics_list)
+    
+    def _fetch_metrics_list(self) -> List[Dict]:
         try:
             # Don't use page[size] - it's not valid for metrics endpoint
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/metrics",
                 headers=self.headers
             )
             response.raise_for_status()
-            data = response.json()
+            data = _json(response)
             return data.get('data', [])
             
         except Exception as e:
             print(f"[ERROR] Failed to fetch metrics list: {e}")
             return []
     
+    def get_metric_ids_by_name(self) -> Dict[str, str]:
+        """Map metric name -> metric ID, built from one (cached) metrics list"""
+        return _cached(self._cache, 'metric_names', METRICS_LIST_TTL, lambda: {
+            m['attributes']['name']: m.get('id')
+            for m in self.get_metrics_list()
+            if m.get('attributes', {}).get('name')
+        })
+    
     def find_metric_id(self, metric_name: str, debug: bool = False) -> Optional[str]:
         """Find metric ID by name"""
-        metrics = self.get_metrics_list()
+        name_to_id = self.get_metric_ids_by_name()
         
         if debug:
             print(f"[DEBUG] Searching for metric: '{metric_name}'")
-            print(f"[DEBUG] Total metrics available: {len(metrics)}")
+            print(f"[DEBUG] Total metrics available: {len(name_to_id)}")
         
-        for metric in metrics:
-            if metric.get('attributes', {}).get('name') == metric_name:
-                metric_id = metric.get('id')
-                if debug:
-                    print(f"[DEBUG] Found match! ID: {metric_id}")
-                return metric_id
+        metric_id = name_to_id.get(metric_name)
+        if metric_id:
+            if debug:
+                print(f"[DEBUG] Found match! ID: {metric_id}")
+            return metric_id
         
         if debug:
             print(f"[DEBUG] No exact match found. Available email metrics:")
+            metrics = self.get_metrics_list()
             email_metrics = [m for m in metrics if 'email' in m.get('attributes', {}).get('name', '').lower()]
             for m in email_metrics[:10]:
                 print(f"  - {m.get('attributes', {}).get('name')}: {m.get('id')}")
@@ -499,7 +722,7 @@ class KlaviyoFetcher:
     def get_metric_aggregate(self, metric_id: str, start_date: str, end_date: str, debug: bool = False) -> Dict:
         """Get aggregated data for a specific metric"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/metric-aggregates",
                 headers=self.headers,
                 json={
@@ -518,7 +741,7 @@ class KlaviyoFetcher:
                 }
             )
             response.raise_for_status()
-            data = response.json()
+            data = _json(response)
             
             if debug:
                 print(f"[DEBUG] Metric aggregate response type: {type(data)}")
@@ -531,23 +754,9 @@ class KlaviyoFetcher:
             
             if 'data' in data and 'attributes' in data['data']:
                 measurements = data['data']['attributes'].get('data', [])
-                for measurement in measurements:
-                    measure_data = measurement.get('measurements', {})
-                    
-                    # Handle both single values and lists
-                    count_val = measure_data.get('count', 0)
-                    unique_val = measure_data.get('unique', 0)
-                    
-                    # If it's a list, sum it; otherwise just add the value
-                    if isinstance(count_val, list):
-                        total += sum(count_val)
-                    else:
-                        total += count_val
-                    
-                    if isinstance(unique_val, list):
-                        unique_total += sum(unique_val)
-                    else:
-                        unique_total += unique_val
+                measure_data = [m.get('measurements', {}) for m in measurements]
+                total = sum(_measure_total(m.get('count', 0)) for m in measure_data)
+                unique_total = sum(_measure_total(m.get('unique', 0)) for m in measure_data)
             
             if debug:
                 print(f"[DEBUG] Total: {total}, Unique: {unique_total}")
@@ -592,8 +801,13 @@ class KlaviyoFetcher:
         metric_ids = {}
         print("\n[INFO] Finding metric IDs...")
         
+        # One metrics-list request resolves every name
+        name_to_id = self.get_metric_ids_by_name()
+        if debug:
+            print(f"[DEBUG] Total metrics available: {len(name_to_id)}")
+        
         for metric_name, key in metric_mapping.items():
-            metric_id = self.find_metric_id(metric_name, debug=debug)
+            metric_id = name_to_id.get(metric_name)
             if metric_id:
                 metric_ids[key] = metric_id
                 print(f"[OK] Found '{metric_name}': {metric_id}")
@@ -604,10 +818,17 @@ class KlaviyoFetcher:
         data = {}
         print("\n[INFO] Fetching metrics data...")
         
-        for key, metric_id in metric_ids.items():
-            print(f"[{list(metric_ids.keys()).index(key)+1}/{len(metric_ids)}] Fetching {key}...")
-            result = self.get_metric_aggregate(metric_id, start_str, end_str, debug=(debug and list(metric_ids.keys()).index(key) == 0))
-            data[key] = result
+        # The aggregate POSTs are independent, so issue them concurrently
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            futures = {}
+            for i, (key, metric_id) in enumerate(metric_ids.items()):
+                print(f"[{i+1}/{len(metric_ids)}] Fetching {key}...")
+                futures[key] = executor.submit(
+                    self.get_metric_aggregate, metric_id, start_str, end_str,
+                    debug=(debug and i == 0)
+                )
+            for key, future in futures.items():
+                data[key] = future.result()
         
         # Calculate totals
         received_total = data.get('received', {}).get('total', 0)
@@ -620,14 +841,20 @@ class KlaviyoFetcher:
         unsubscribed_total = data.get('unsubscribed', {}).get('total', 0)
         spam_total = data.get('spam', {}).get('total', 0)
         
+        # Rates reported under more than one stage
+        delivery_rate = _pct(received_total - bounced_total, received_total)
+        bounce_rate = _pct(bounced_total, received_total)
+        open_rate = _pct(opened_unique, received_unique)
+        click_to_open_rate = _pct(clicked_unique, opened_unique)
+        
         metrics = {
             # STAGE 1: AWARENESS (How many people did we reach?)
             'awareness': {
                 'emails_sent': received_total,
                 'unique_recipients': received_unique,
                 'emails_delivered': received_total - bounced_total,
-                'delivery_rate': round(((received_total - bounced_total) / received_total * 100) if received_total > 0 else 0, 2),
-                'bounce_rate': round((bounced_total / received_total * 100) if received_total > 0 else 0, 2),
+                'delivery_rate': delivery_rate,
+                'bounce_rate': bounce_rate,
                 'net_reach': received_total - bounced_total
             },
             
@@ -637,9 +864,9 @@ class KlaviyoFetcher:
                 'unique_opens': opened_unique,
                 'total_clicks': clicked_total,
                 'unique_clicks': clicked_unique,
-                'open_rate': round((opened_unique / received_unique * 100) if received_unique > 0 else 0, 2),
-                'click_rate': round((clicked_unique / received_unique * 100) if received_unique > 0 else 0, 2),
-                'click_to_open_rate': round((clicked_unique / opened_unique * 100) if opened_unique > 0 else 0, 2),
+                'open_rate': open_rate,
+                'click_rate': _pct(clicked_unique, received_unique),
+                'click_to_open_rate': click_to_open_rate,
                 'avg_opens_per_recipient': round(opened_total / opened_unique, 2) if opened_unique > 0 else 0
             },
             
@@ -648,24 +875,24 @@ class KlaviyoFetcher:
                 'note': 'Add conversion tracking via specific metric IDs',
                 'engaged_recipients': opened_unique,
                 'highly_engaged': clicked_unique,
-                'engagement_depth': round((clicked_unique / opened_unique * 100) if opened_unique > 0 else 0, 2)
+                'engagement_depth': click_to_open_rate
             },
             
             # STAGE 4: RETENTION (Are people staying on our list?)
             'retention': {
                 'total_unsubscribed': unsubscribed_total,
                 'total_spam_complaints': spam_total,
-                'unsubscribe_rate': round((unsubscribed_total / received_total * 100) if received_total > 0 else 0, 2),
-                'spam_complaint_rate': round((spam_total / received_total * 100) if received_total > 0 else 0, 2),
+                'unsubscribe_rate': _pct(unsubscribed_total, received_total),
+                'spam_complaint_rate': _pct(spam_total, received_total),
                 'list_health_score': round(100 - ((unsubscribed_total + spam_total) / received_total * 100) if received_total > 0 else 100, 2)
             },
             
             # STAGE 5: QUALITY (How healthy is our email program?)
             'quality': {
                 'total_bounced': bounced_total,
-                'bounce_rate': round((bounced_total / received_total * 100) if received_total > 0 else 0, 2),
-                'deliverability_score': round(((received_total - bounced_total) / received_total * 100) if received_total > 0 else 0, 2),
-                'engagement_quality': round(((opened_unique + clicked_unique) / received_unique * 100) if received_unique > 0 else 0, 2),
+                'bounce_rate': bounce_rate,
+                'deliverability_score': delivery_rate,
+                'engagement_quality': _pct(opened_unique + clicked_unique, received_unique),
                 'spam_score': spam_total
             },
             
@@ -674,7 +901,7 @@ class KlaviyoFetcher:
                 'time_period': f"{days} days",
                 'total_sent': received_total,
                 'unique_recipients': received_unique,
-                'overall_engagement_rate': round(((opened_unique / received_unique * 100)) if received_unique > 0 else 0, 2)
+                'overall_engagement_rate': open_rate
             }
         }
         
@@ -683,94 +910,192 @@ class KlaviyoFetcher:
 
 def print_customer_journey_report(metrics: Dict, platform: str):
     """Print a formatted customer journey report"""
-    print("\n" + "="*70)
-    print(f"{platform.upper()} - CUSTOMER JOURNEY ANALYSIS")
-    print("="*70)
+    # Collected and written once rather than flushing stdout per line
+    out = []
+    
+    out.append("\n" + "="*70)
+    out.append(f"{platform.upper()} - CUSTOMER JOURNEY ANALYSIS")
+    out.append("="*70)
     
     # STAGE 1: AWARENESS
     if 'awareness' in metrics:
         awareness = metrics['awareness']
-        print("\n1. AWARENESS - How many people did we reach?")
-        print("-" * 70)
-        print(f"  Emails Sent:        {awareness.get('emails_sent', 0):,}")
-        print(f"  Emails Delivered:   {awareness.get('emails_delivered', 0):,}")
-        print(f"  Delivery Rate:      {awareness.get('delivery_rate', 0)}%")
-        print(f"  Bounce Rate:        {awareness.get('bounce_rate', 0)}%")
-        print(f"  Net Reach:          {awareness.get('net_reach', 0):,} people")
+        out.append("\n1. AWARENESS - How many people did we reach?")
+        out.append("-" * 70)
+        out.append(f"  Emails Sent:        {awareness.get('emails_sent', 0):,}")
+        out.append(f"  Emails Delivered:   {awareness.get('emails_delivered', 0):,}")
+        out.append(f"  Delivery Rate:      {awareness.get('delivery_rate', 0)}%")
+        out.append(f"  Bounce Rate:        {awareness.get('bounce_rate', 0)}%")
+        out.append(f"  Net Reach:          {awareness.get('net_reach', 0):,} people")
     
     # STAGE 2: ENGAGEMENT
     if 'engagement' in metrics:
         engagement = metrics['engagement']
-        print("\n2. ENGAGEMENT - How many people engaged with our emails?")
-        print("-" * 70)
-        print(f"  Total Opens:        {engagement.get('total_opened', engagement.get('total_opens', 0)):,}")
-        print(f"  Total Clicks:       {engagement.get('total_clicked', engagement.get('total_clicks', 0)):,}")
-        print(f"  Open Rate:          {engagement.get('open_rate', 0)}%")
-        print(f"  Click Rate:         {engagement.get('click_rate', 0)}%")
-        print(f"  Click-to-Open:      {engagement.get('click_to_open_rate', 0)}%")
+        out.append("\n2. ENGAGEMENT - How many people engaged with our emails?")
+        out.append("-" * 70)
+        out.append(f"  Total Opens:        {engagement.get('total_opened', engagement.get('total_opens', 0)):,}")
+        out.append(f"  Total Clicks:       {engagement.get('total_clicked', engagement.get('total_clicks', 0)):,}")
+        out.append(f"  Open Rate:          {engagement.get('open_rate', 0)}%")
+        out.append(f"  Click Rate:         {engagement.get('click_rate', 0)}%")
+        out.append(f"  Click-to-Open:      {engagement.get('click_to_open_rate', 0)}%")
     
     # STAGE 3: RESPONSE
     if 'response' in metrics:
         response = metrics['response']
-        print("\n3. RESPONSE - How many people took action?")
-        print("-" * 70)
+        out.append("\n3. RESPONSE - How many people took action?")
+        out.append("-" * 70)
         
         if 'total_replied' in response:
-            print(f"  Total Replies:      {response.get('total_replied', 0):,}")
-            print(f"  Total Leads:        {response.get('total_leads', 0):,}")
-            print(f"  Reply Rate:         {response.get('reply_rate', 0)}%")
-            print(f"  Lead Conv. Rate:    {response.get('lead_conversion_rate', 0)}%")
+            out.append(f"  Total Replies:      {response.get('total_replied', 0):,}")
+            out.append(f"  Total Leads:        {response.get('total_leads', 0):,}")
+            out.append(f"  Reply Rate:         {response.get('reply_rate', 0)}%")
+            out.append(f"  Lead Conv. Rate:    {response.get('lead_conversion_rate', 0)}%")
         else:
-            print(f"  Engaged Recipients: {response.get('engaged_recipients', 0):,}")
-            print(f"  Highly Engaged:     {response.get('highly_engaged', 0):,}")
-            print(f"  Engagement Depth:   {response.get('engagement_depth', 0)}%")
+            out.append(f"  Engaged Recipients: {response.get('engaged_recipients', 0):,}")
+            out.append(f"  Highly Engaged:     {response.get('highly_engaged', 0):,}")
+            out.append(f"  Engagement Depth:   {response.get('engagement_depth', 0)}%")
     
     # STAGE 4: RETENTION
     if 'retention' in metrics:
         retention = metrics['retention']
-        print("\n4. RETENTION - Are people staying on our list?")
-        print("-" * 70)
-        print(f"  Unsubscribes:       {retention.get('total_unsubscribed', 0):,}")
-        print(f"  Unsubscribe Rate:   {retention.get('unsubscribe_rate', 0)}%")
+        out.append("\n4. RETENTION - Are people staying on our list?")
+        out.append("-" * 70)
+        out.append(f"  Unsubscribes:       {retention.get('total_unsubscribed', 0):,}")
+        out.append(f"  Unsubscribe Rate:   {retention.get('unsubscribe_rate', 0)}%")
         
         if 'active_list_size' in retention:
-            print(f"  Active List Size:   {retention.get('active_list_size', 0):,}")
+            out.append(f"  Active List Size:   {retention.get('active_list_size', 0):,}")
         if 'list_health_score' in retention:
-            print(f"  List Health Score:  {retention.get('list_health_score', 0)}%")
+            out.append(f"  List Health Score:  {retention.get('list_health_score', 0)}%")
     
     # STAGE 5: QUALITY
     if 'quality' in metrics:
         quality = metrics['quality']
-        print("\n5. QUALITY - How healthy is our email program?")
-        print("-" * 70)
-        print(f"  Total Bounces:      {quality.get('total_bounced', 0):,}")
-        print(f"  Bounce Rate:        {quality.get('bounce_rate', 0)}%")
-        print(f"  Deliverability:     {quality.get('deliverability_score', 0)}%")
-        print(f"  Engagement Quality: {quality.get('engagement_quality', 0)}%")
+        out.append("\n5. QUALITY - How healthy is our email program?")
+        out.append("-" * 70)
+        out.append(f"  Total Bounces:      {quality.get('total_bounced', 0):,}")
+        out.append(f"  Bounce Rate:        {quality.get('bounce_rate', 0)}%")
+        out.append(f"  Deliverability:     {quality.get('deliverability_score', 0)}%")
+        out.append(f"  Engagement Quality: {quality.get('engagement_quality', 0)}%")
     
     # SALES PIPELINE (Instantly only)
     if 'sales_pipeline' in metrics:
         pipeline = metrics['sales_pipeline']
-        print("\n6. SALES PIPELINE - Business outcomes (Instantly-specific)")
-        print("-" * 70)
-        print(f"  Opportunities:      {pipeline.get('opportunities', 0):,}")
-        print(f"  Interested:         {pipeline.get('interested', 0):,}")
-        print(f"  Meetings Booked:    {pipeline.get('meetings_booked', 0):,}")
-        print(f"  Meetings Completed: {pipeline.get('meetings_completed', 0):,}")
-        print(f"  Deals Closed:       {pipeline.get('deals_closed', 0):,}")
-        print(f"  Meeting Show Rate:  {pipeline.get('meeting_show_rate', 0)}%")
-        print(f"  Close Rate:         {pipeline.get('close_rate', 0)}%")
-    
-    print("\n" + "="*70)
-
-
-def export_to_json(metrics: Dict, filename: str):
-    """Export metrics to JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(metrics, f, indent=2)
+        out.append("\n6. SALES PIPELINE - Business outcomes (Instantly-specific)")
+        out.append("-" * 70)
+        out.append(f"  Opportunities:      {pipeline.get('opportunities', 0):,}")
+        out.append(f"  Interested:         {pipeline.get('interested', 0):,}")
+        out.append(f"  Meetings Booked:    {pipeline.get('meetings_booked', 0):,}")
+        out.append(f"  Meetings Completed: {pipeline.get('meetings_completed', 0):,}")
+        out.append(f"  Deals Closed:       {pipeline.get('deals_closed', 0):,}")
+        out.append(f"  Meeting Show Rate:  {pipeline.get('meeting_show_rate', 0)}%")
+        out.append(f"  Close Rate:         {pipeline.get('close_rate', 0)}%")
+    
+    out.append("\n" + "="*70)
+    
+    print("\n".join(out))
+
+
+# Top-level marker identifying a compact export; load_compact only decodes
+# schema/rows tables in documents that carry it
+COMPACT_FORMAT = 'compact-v1'
+
+
+def _compact(obj):
+    """
+    Replace every list of same-keyed dicts with {"_schema": keys, "_rows": values}
+    so repeated keys (e.g. in top_campaigns) are written once. A real dict
+    that happens to have exactly those two keys is escaped as
+    {"_schema": None, "_rows": dict} so it can't be mistaken for a table.
+    """
+    if isinstance(obj, dict):
+        compacted = {key: _compact(value) for key, value in obj.items()}
+        if compacted.keys() == {'_schema', '_rows'}:
+            return {'_schema': None, '_rows': compacted}
+        return compacted
+    if isinstance(obj, list):
+        if obj and all(isinstance(row, dict) for row in obj):
+            keys = list(obj[0])
+            if all(list(row) == keys for row in obj):
+                return {'_schema': keys, '_rows': [[_compact(row[k]) for k in keys] for row in obj]}
+        return [_compact(value) for value in obj]
+    return obj
+
+
+def _expand(obj):
+    """Inverse of _compact"""
+    if isinstance(obj, dict):
+        if obj.keys() == {'_schema', '_rows'}:
+            keys = obj['_schema']
+            if keys is None:
+                return {key: _expand(value) for key, value in obj['_rows'].items()}
+            return [dict(zip(keys, (_expand(v) for v in row))) for row in obj['_rows']]
+        return {key: _expand(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_expand(value) for value in obj]
+    return obj
+
+
+def export_to_json(metrics: Dict, filename: str, compact: bool = False, pretty: bool = True):
+    """
+    Export metrics to JSON file
+    
+    Args:
+        metrics: Metrics to export
+        filename: Output path
+        compact: Write lists of records as schema + rows, without indentation
+                 (smaller archival files; read back with load_compact)
+        pretty: Indent the output (ignored when compact); pass False for
+                machine-consumed files
+    """
+    indent = pretty and not compact
+    if compact:
+        metrics = {'_format': COMPACT_FORMAT, **_compact(metrics)}
+    
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+            head, separator, tail = b"{\n", b",\n", b"\n}"
+        else:
+            head, separator, tail = b"{", b",", b"}"
+        with open(filename, 'wb') as f:
+            if not isinstance(metrics, dict) or not metrics:
+                f.write(orjson.dumps(metrics, option=option))
+            else:
+                # Serialize one top-level key at a time so the combined export
+                # never holds the whole document as a single bytes object.
+                # Each {key: value} chunk is stripped of its braces, which
+                # leaves the output identical to dumping the dict in one go.
+                f.write(head)
+                for i, (key, value) in enumerate(metrics.items()):
+                    if i:
+                        f.write(separator)
+                    f.write(orjson.dumps({key: value}, option=option)[len(head):-len(tail)])
+                f.write(tail)
+    else:
+        with open(filename, 'w') as f:
+            if indent:
+                json.dump(metrics, f, indent=2)
+            else:
+                json.dump(metrics, f, separators=(',', ':'))
     print(f"\n[OK] Metrics exported to: {filename}")
 
 
+def load_compact(filename: str) -> Dict:
+    """
+    Load a file written by export_to_json; compact exports (marked with
+    _format) are expanded, anything else is returned as stored
+    """
+    with open(filename, 'rb') as f:
+        data = orjson.loads(f.read()) if orjson is not None else json.load(f)
+    if isinstance(data, dict) and data.get('_format') == COMPACT_FORMAT:
+        data = dict(data)
+        del data['_format']
+        return _expand(data)
+    return data
+
+
 def main():
     """Main execution function"""
     import argparse
@@ -808,6 +1133,21 @@ def main():
         action='store_true',
         help='Show debug output for API responses'
     )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='With --export: indent the combined export (per-platform files are always indented)'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='With --export: write compact schema/rows JSON (read back with load_compact)'
+    )
+    parser.add_argument(
+        '--aggregate-only',
+        action='store_true',
+        help='Instantly: use one aggregate call instead of per-campaign analytics (no top campaigns)'
+    )
     
     args = parser.parse_args()
     
@@ -823,12 +1163,16 @@ def main():
             print("[ERROR] Instantly API key required. Use --instantly-key or set INSTANTLY_API_KEY")
         else:
             fetcher = InstantlyFetcher(instantly_key)
-            metrics = fetcher.calculate_customer_journey_metrics(days=args.days, debug=args.debug)
+            metrics = fetcher.calculate_customer_journey_metrics(
+                days=args.days,
+                debug=args.debug,
+                aggregate_only=args.aggregate_only
+            )
             results['instantly'] = metrics
             print_customer_journey_report(metrics, 'Instantly')
             
             if args.export:
-                export_to_json(metrics, 'instantly_customer_journey.json')
+                export_to_json(metrics, 'instantly_customer_journey.json', compact=args.compact)
     
     # Fetch Klaviyo metrics
     if args.platform in ['klaviyo', 'both']:
@@ -841,11 +1185,12 @@ def main():
             print_customer_journey_report(metrics, 'Klaviyo')
             
             if args.export:
-                export_to_json(metrics, 'klaviyo_customer_journey.json')
+                export_to_json(metrics, 'klaviyo_customer_journey.json', compact=args.compact)
     
     # Export combined results
     if args.export and len(results) > 1:
-        export_to_json(results, 'email_customer_journey_combined.json')
+        export_to_json(results, 'email_customer_journey_combined.json',
+                       compact=args.compact, pretty=args.pretty)
     
     return results
 
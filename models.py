@@ -3,21 +3,43 @@ Database Models for ContentClicks Customer Journey Dashboard
 Uses Firestore for cloud-native storage with historical tracking
 """
 
+import concurrent.futures
+import copy
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional
-from google.cloud import firestore
-from google.cloud.firestore_v1.base_query import FieldFilter
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 import os
 
-# Initialize Firestore client with error handling
-try:
-    db = firestore.Client()
+if TYPE_CHECKING:
+    from google.cloud import firestore
+
+
+@lru_cache(maxsize=None)
+def _firestore():
+    """
+    The google.cloud.firestore module, imported on first use. Importing it
+    pulls in google-auth and gRPC, which CLI paths that never touch the
+    database shouldn't pay for.
+    """
+    from google.cloud import firestore
+    return firestore
+
+
+@lru_cache(maxsize=None)
+def _client() -> 'firestore.Client':
+    """
+    Firestore client, created on first use rather than at import so CLI paths
+    that never touch the database skip the auth/connection setup. A failed
+    initialization raises and is retried on the next call.
+    """
+    client = _firestore().Client()
     print("[OK] Firestore client initialized")
-except Exception as e:
-    print(f"[ERROR] Failed to initialize Firestore: {e}")
-    print("[INFO] Make sure Firestore database is created and permissions are granted")
-    # Create a dummy client for import to work, actual operations will fail gracefully
-    db = None
+    return client
+
 
 # Collection references
 CUSTOMERS_COLLECTION = 'customers'
@@ -25,6 +47,45 @@ CREDENTIALS_COLLECTION = 'credentials'
 HISTORICAL_METRICS_COLLECTION = 'historical_metrics'
 TOP_PERFORMERS_COLLECTION = 'top_performers'
 
+# HistoricalMetric.get_latest_for_customer results, reused for repeat
+# dashboard loads; entries are dropped whenever the customer's metrics are
+# written or the customer is deleted
+LATEST_METRICS_TTL_SECONDS = 60
+_LATEST_CACHE = {}
+_LATEST_INVALIDATED_AT = {}
+_LATEST_LOCK = threading.Lock()
+
+# Attempts BulkWriter makes per write before HistoricalMetric.add_many
+# counts it as failed (the library's own default)
+BULK_WRITE_MAX_ATTEMPTS = 15
+
+
+def invalidate_latest_cache(customer_id: str = None):
+    """Drop cached latest metrics for one customer, or for all if None"""
+    with _LATEST_LOCK:
+        now = time.monotonic()
+        # Older marks can't matter: a read that started before them would
+        # already be past the TTL, so drop them rather than keep one per
+        # customer for the life of the process
+        for key, invalidated_at in list(_LATEST_INVALIDATED_AT.items()):
+            if now - invalidated_at > LATEST_METRICS_TTL_SECONDS:
+                del _LATEST_INVALIDATED_AT[key]
+        # Remembered so a read that started before this point isn't cached
+        _LATEST_INVALIDATED_AT[customer_id] = now
+        if customer_id is None:
+            _LATEST_CACHE.clear()
+        else:
+            _LATEST_CACHE.pop(customer_id, None)
+
+
+def _kpis_path(customer_id: str, medium: str, journey_stage: str, year, month) -> str:
+    """
+    Path of the kpis subcollection for one customer/medium/stage/month.
+    Resolving the full path with one db.document()/db.collection() call is
+    cheaper than chaining eight .collection()/.document() references.
+    """
+    return f"{HISTORICAL_METRICS_COLLECTION}/{customer_id}/{medium}/{journey_stage}/{year}/{month}/kpis"
+
 
 class Database:
     """Database connection manager for Firestore"""
@@ -32,34 +93,50 @@ class Database:
     @staticmethod
     def get_connection():
         """Get Firestore client"""
-        if db is None:
-            raise RuntimeError("Firestore client not initialized. Check logs for initialization errors.")
-        return db
+        try:
+            return _client()
+        except Exception as e:
+            raise RuntimeError(f"Firestore client not initialized: {e}") from e
     
     @staticmethod
     def init_db():
         """Initialize Firestore collections (no-op for Firestore, collections are created on first write)"""
-        if db is None:
-            print("[ERROR] Firestore client not initialized")
+        try:
+            _client()
+        except Exception as e:
+            print(f"[ERROR] Failed to initialize Firestore: {e}")
+            print("[INFO] Make sure Firestore database is created and permissions are granted")
             return False
         print("[OK] Firestore initialized successfully")
         return True
 
 
+@dataclass(slots=True)
+class CustomerRow:
+    """
+    One customer in the customer list (slotted: no per-row __dict__). Holds
+    only the fields the list renders; use Customer.get_by_id for the full
+    document.
+    """
+    id: str
+    name: Optional[str] = None
+    industry: Optional[str] = None
+
+
 class Customer:
     """Customer profile model"""
     
     @staticmethod
     def create(name: str, industry: str) -> str:
         """Create a new customer profile"""
-        customer_ref = db.collection(CUSTOMERS_COLLECTION).document()
+        customer_ref = _client().collection(CUSTOMERS_COLLECTION).document()
         customer_id = customer_ref.id
         
         customer_data = {
             'name': name,
             'industry': industry,
-            'created_at': firestore.SERVER_TIMESTAMP,
-            'updated_at': firestore.SERVER_TIMESTAMP
+            'created_at': _firestore().SERVER_TIMESTAMP,
+            'updated_at': _firestore().SERVER_TIMESTAMP
         }
         
         customer_ref.set(customer_data)
@@ -67,22 +144,34 @@ class Customer:
         return customer_id
     
     @staticmethod
-    def get_all() -> List[Dict]:
-        """Get all customer profiles"""
+    def get_all() -> List[CustomerRow]:
+        """
+        Get all customer profiles
+        
+        Only id, name and industry are fetched (a Firestore projection), as
+        that is all the customer list renders.
+        
+        Returns: CustomerRow records (serialized by jsonify like dicts)
+        """
         customers = []
-        customers_ref = db.collection(CUSTOMERS_COLLECTION).order_by('name').stream()
+        # Projection: only the listed fields are sent over the wire
+        query = _client().collection(CUSTOMERS_COLLECTION).select(['name', 'industry'])
+        customers_ref = query.order_by('name').stream()
         
         for doc in customers_ref:
             customer_data = doc.to_dict()
-            customer_data['id'] = doc.id
-            customers.append(customer_data)
+            customers.append(CustomerRow(
+                id=doc.id,
+                name=customer_data.get('name'),
+                industry=customer_data.get('industry')
+            ))
         
         return customers
     
     @staticmethod
     def get_by_id(customer_id: str) -> Optional[Dict]:
         """Get customer profile by ID"""
-        doc_ref = db.collection(CUSTOMERS_COLLECTION).document(customer_id)
+        doc_ref = _client().collection(CUSTOMERS_COLLECTION).document(customer_id)
         doc = doc_ref.get()
         
         if doc.exists:
@@ -95,9 +184,9 @@ class Customer:
     @staticmethod
     def update(customer_id: str, name: str = None, industry: str = None):
         """Update customer profile"""
-        doc_ref = db.collection(CUSTOMERS_COLLECTION).document(customer_id)
+        doc_ref = _client().collection(CUSTOMERS_COLLECTION).document(customer_id)
         
-        updates = {'updated_at': firestore.SERVER_TIMESTAMP}
+        updates = {'updated_at': _firestore().SERVER_TIMESTAMP}
         
         if name:
             updates['name'] = name
@@ -110,20 +199,15 @@ class Customer:
     @staticmethod
     def delete(customer_id: str):
         """Delete customer profile and all associated data"""
-        # Delete customer document
-        db.collection(CUSTOMERS_COLLECTION).document(customer_id).delete()
-        
-        # Delete credentials
-        credentials_ref = db.collection(CREDENTIALS_COLLECTION).document(customer_id)
-        credentials_ref.delete()
-        
-        # Delete historical metrics (batch delete)
-        metrics_ref = db.collection(HISTORICAL_METRICS_COLLECTION).document(customer_id)
-        metrics_ref.delete()
-        
-        # Delete top performers
-        performers_ref = db.collection(TOP_PERFORMERS_COLLECTION).document(customer_id)
-        performers_ref.delete()
+        # Customer, credentials, historical metrics and top performers
+        # documents are removed atomically in one commit
+        db = _client()
+        batch = db.batch()
+        for collection in (CUSTOMERS_COLLECTION, CREDENTIALS_COLLECTION,
+                           HISTORICAL_METRICS_COLLECTION, TOP_PERFORMERS_COLLECTION):
+            batch.delete(db.collection(collection).document(customer_id))
+        batch.commit()
+        invalidate_latest_cache(customer_id)
 
 
 class CustomerCredential:
@@ -132,27 +216,17 @@ class CustomerCredential:
     @staticmethod
     def set(customer_id: str, platform: str, credential_key: str, credential_value: str):
         """Set or update a customer credential"""
-        doc_ref = db.collection(CREDENTIALS_COLLECTION).document(customer_id)
+        doc_ref = _client().collection(CREDENTIALS_COLLECTION).document(customer_id)
         
-        # Get existing credentials or create new
-        doc = doc_ref.get()
-        if doc.exists:
-            credentials = doc.to_dict()
-        else:
-            credentials = {}
-        
-        # Create nested structure: platform -> credential_key -> value
-        if platform not in credentials:
-            credentials[platform] = {}
-        
-        credentials[platform][credential_key] = credential_value
-        
-        doc_ref.set(credentials, merge=True)
+        # Nested structure: platform -> credential_key -> value. merge=True
+        # merges nested maps at the leaf, so other platforms and keys are
+        # preserved without reading the document first.
+        doc_ref.set({platform: {credential_key: credential_value}}, merge=True)
     
     @staticmethod
     def get(customer_id: str, platform: str, credential_key: str) -> Optional[str]:
         """Get a specific credential"""
-        doc_ref = db.collection(CREDENTIALS_COLLECTION).document(customer_id)
+        doc_ref = _client().collection(CREDENTIALS_COLLECTION).document(customer_id)
         doc = doc_ref.get()
         
         if doc.exists:
@@ -164,7 +238,7 @@ class CustomerCredential:
     @staticmethod
     def get_all_for_customer(customer_id: str) -> Dict[str, Dict[str, str]]:
         """Get all credentials for a customer, organized by platform"""
-        doc_ref = db.collection(CREDENTIALS_COLLECTION).document(customer_id)
+        doc_ref = _client().collection(CREDENTIALS_COLLECTION).document(customer_id)
         doc = doc_ref.get()
         
         if doc.exists:
@@ -175,7 +249,7 @@ class CustomerCredential:
     @staticmethod
     def delete(customer_id: str, platform: str, credential_key: str):
         """Delete a specific credential"""
-        doc_ref = db.collection(CREDENTIALS_COLLECTION).document(customer_id)
+        doc_ref = _client().collection(CREDENTIALS_COLLECTION).document(customer_id)
         doc = doc_ref.get()
         
         if doc.exists:
@@ -193,6 +267,19 @@ class CustomerCredential:
 class HistoricalMetric:
     """Historical KPI metrics model with monthly snapshots"""
     
+    @staticmethod
+    def _document(kpi_value: float, benchmark_value: float, time_period_days: int,
+                  year: int, month: int) -> Dict:
+        """Stored fields of one KPI snapshot, shared by add and add_many"""
+        return {
+            'kpi_value': kpi_value,
+            'benchmark_value': benchmark_value,
+            'time_period_days': time_period_days,
+            'recorded_at': _firestore().SERVER_TIMESTAMP,
+            'year': year,
+            'month': month
+        }
+    
     @staticmethod
     def add(customer_id: str, medium: str, journey_stage: str, kpi_name: str, 
             kpi_value: float, benchmark_value: float, time_period_days: int,
@@ -206,31 +293,90 @@ class HistoricalMetric:
             month = now.month
         
         # Structure: historical_metrics/{customer_id}/{medium}/{journey_stage}/{year}/{month}/{kpi_name}
-        path = f"{HISTORICAL_METRICS_COLLECTION}/{customer_id}/{medium}/{journey_stage}/{year}/{month}/kpis/{kpi_name}"
+        path = f"{_kpis_path(customer_id, medium, journey_stage, year, month)}/{kpi_name}"
         print(f"        [FIRESTORE] Writing to: {path}")
         print(f"        [FIRESTORE] Value: {kpi_value}")
 
-        doc_ref = (db.collection(HISTORICAL_METRICS_COLLECTION)
-                   .document(customer_id)
-                   .collection(medium)
-                   .document(journey_stage)
-                   .collection(str(year))
-                   .document(str(month))
-                   .collection('kpis')
-                   .document(kpi_name))
-
-        metric_data = {
-            'kpi_value': kpi_value,
-            'benchmark_value': benchmark_value,
-            'time_period_days': time_period_days,
-            'recorded_at': firestore.SERVER_TIMESTAMP,
-            'year': year,
-            'month': month
-        }
-
-        doc_ref.set(metric_data)
+        # A plain set() for one record: it raises on failure, and skips
+        # BulkWriter's thread pool startup
+        _client().document(path).set(HistoricalMetric._document(
+            kpi_value, benchmark_value, time_period_days, year, month
+        ))
+        invalidate_latest_cache(customer_id)
         print(f"        [FIRESTORE] ✓ Written successfully")
     
+    @staticmethod
+    def add_many(customer_id: str, records: Iterable[tuple], chunk_size: int = 1000) -> int:
+        """
+        Add several historical metric records using Firestore's BulkWriter
+        
+        BulkWriter sends writes in parallel batches with built-in throttling
+        and retries, which is faster than committing WriteBatches serially.
+        Records are consumed lazily in chunks, so a generator can be passed
+        without materializing every row first.
+        
+        Args:
+            customer_id: Customer ID
+            records: Iterable of (medium, journey_stage, kpi_name, kpi_value,
+                     benchmark_value, time_period_days, year, month) tuples
+            chunk_size: Writes queued before waiting for the writer to flush
+        
+        Returns: Number of records written
+        
+        Raises: RuntimeError if any write still failed after
+                BULK_WRITE_MAX_ATTEMPTS attempts (BulkWriter itself
+                never raises for failed writes)
+        """
+        db = _client()
+        now = datetime.now()
+        records = iter(records)
+        writer = None
+        written = 0
+        failures = []
+        
+        def on_write_error(error, _writer) -> bool:
+            """Retry like BulkWriter's default, recording writes it gives up on"""
+            if error.attempts < BULK_WRITE_MAX_ATTEMPTS:
+                return True
+            failures.append(error)
+            return False
+        
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            if writer is None:
+                writer = db.bulk_writer()
+                writer.on_write_error(on_write_error)
+            
+            for medium, journey_stage, kpi_name, kpi_value, benchmark_value, time_period_days, year, month in chunk:
+                if year is None or month is None:
+                    year = now.year
+                    month = now.month
+                
+                doc_ref = db.document(f"{_kpis_path(customer_id, medium, journey_stage, year, month)}/{kpi_name}")
+                
+                writer.set(doc_ref, HistoricalMetric._document(
+                    kpi_value, benchmark_value, time_period_days, year, month
+                ))
+            
+            # Bound the number of queued writes held in memory
+            writer.flush()
+            written += len(chunk)
+        
+        if writer is not None:
+            # close() waits for anything still in flight
+            writer.close()
+            invalidate_latest_cache(customer_id)
+            if failures:
+                print(f"        [FIRESTORE] ✗ {len(failures)} of {written} metric writes failed for {customer_id}")
+                raise RuntimeError(
+                    f"{len(failures)} of {written} metric writes failed for {customer_id}: "
+                    f"{failures[0].message}"
+                )
+            print(f"        [FIRESTORE] ✓ Bulk wrote {written} metrics for {customer_id}")
+        return written
+    
     @staticmethod
     def get_history(customer_id: str, medium: str, journey_stage: str,
                     kpi_name: str, months: int = 12) -> List[Dict]:
@@ -243,43 +389,39 @@ class HistoricalMetric:
         current_year = now.year
         current_month = now.month
 
-        results = []
-
-        # Iterate through last N months
+        # Build the reference for each of the last N months, newest first
+        db = _client()
+        months_and_refs = []
+        # Months counted from year 0 so one divmod gives each (year, month)
+        current_index = current_year * 12 + current_month - 1
         for i in range(months):
-            # Calculate year and month for this iteration
-            month = current_month - i
-            year = current_year
+            year, month_offset = divmod(current_index - i, 12)
+            month = month_offset + 1
 
-            while month <= 0:
-                month += 12
-                year -= 1
+            doc_ref = db.document(f"{_kpis_path(customer_id, medium, journey_stage, year, month)}/{kpi_name}")
+            months_and_refs.append((year, month, doc_ref))
 
-            # Query this month's data
-            try:
-                path = f"{HISTORICAL_METRICS_COLLECTION}/{customer_id}/{medium}/{journey_stage}/{year}/{month}/kpis/{kpi_name}"
-
-                doc_ref = (db.collection(HISTORICAL_METRICS_COLLECTION)
-                          .document(customer_id)
-                          .collection(medium)
-                          .document(journey_stage)
-                          .collection(str(year))
-                          .document(str(month))
-                          .collection('kpis')
-                          .document(kpi_name))
-
-                doc = doc_ref.get()
-
-                if doc.exists:
-                    data = doc.to_dict()
-                    data['date'] = f"{year}-{month:02d}"
-                    results.append(data)
-                    print(f"[FIRESTORE READ] ✓ Found {year}-{month:02d}: value={data.get('kpi_value')}")
-                else:
-                    print(f"[FIRESTORE READ] ✗ No data for {year}-{month:02d} at {path}")
-            except Exception as e:
-                print(f"[FIRESTORE READ ERROR] Could not fetch data for {year}-{month:02d}: {e}")
-                continue
+        # Fetch every month in one batched read instead of one RPC per month
+        try:
+            snapshots = {
+                doc.reference.path: doc
+                for doc in db.get_all([doc_ref for _, _, doc_ref in months_and_refs])
+            }
+        except Exception as e:
+            print(f"[FIRESTORE READ ERROR] Could not fetch history: {e}")
+            snapshots = {}
+
+        results = []
+        for year, month, doc_ref in months_and_refs:
+            doc = snapshots.get(doc_ref.path)
+
+            if doc is not None and doc.exists:
+                data = doc.to_dict()
+                data['date'] = f"{year}-{month:02d}"
+                results.append(data)
+                print(f"[FIRESTORE READ] ✓ Found {year}-{month:02d}: value={data.get('kpi_value')}")
+            else:
+                print(f"[FIRESTORE READ] ✗ No data for {year}-{month:02d} at {doc_ref.path}")
 
         # Reverse to get chronological order (oldest to newest)
         results.reverse()
@@ -293,6 +435,14 @@ class HistoricalMetric:
 
         print(f"[FIRESTORE READ] Getting latest metrics for customer {customer_id}")
 
+        with _LATEST_LOCK:
+            cached = _LATEST_CACHE.get(customer_id)
+        if cached and time.monotonic() - cached[0] < LATEST_METRICS_TTL_SECONDS:
+            print(f"[FIRESTORE READ] Using cached latest metrics for customer {customer_id}")
+            # Callers get their own copy, so mutating it can't alter the cache
+            return copy.deepcopy(cached[1])
+        fetched_at = time.monotonic()
+
         now = datetime.now()
         current_year = now.year
         current_month = now.month
@@ -308,41 +458,53 @@ class HistoricalMetric:
             'website': ['awareness', 'engagement', 'conversion', 'retention', 'advocacy']
         }
 
-        for medium, stages in mediums_and_stages.items():
+        db = _client()
+
+        def fetch_stage(medium, journey_stage):
+            """Stream the current month's KPIs for one medium/stage"""
+            kpis_ref = db.collection(_kpis_path(customer_id, medium, journey_stage, current_year, current_month))
+
+            kpi_list = []
+            for kpi_doc in kpis_ref.stream():
+                kpi_data = kpi_doc.to_dict()
+                kpi_data['kpi_name'] = kpi_doc.id
+                kpi_list.append(kpi_data)
+            return kpi_list
+
+        # The 15 stage reads are independent, so run them concurrently
+        pairs = [(medium, stage) for medium, stages in mediums_and_stages.items() for stage in stages]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(pairs)) as executor:
+            futures = [executor.submit(fetch_stage, medium, stage) for medium, stage in pairs]
+
+        for medium in mediums_and_stages:
             metrics[medium] = {}
 
-            for journey_stage in stages:
-                # Get current month's data for this medium/stage
-                try:
-                    kpis_ref = (db.collection(HISTORICAL_METRICS_COLLECTION)
-                               .document(customer_id)
-                               .collection(medium)
-                               .document(journey_stage)
-                               .collection(str(current_year))
-                               .document(str(current_month))
-                               .collection('kpis'))
-
-                    kpis = kpis_ref.stream()
-
-                    # Get all KPIs for this stage (there may be multiple)
-                    kpi_list = []
-                    for kpi_doc in kpis:
-                        kpi_data = kpi_doc.to_dict()
-                        kpi_data['kpi_name'] = kpi_doc.id
-                        kpi_list.append(kpi_data)
-                        print(f"[FIRESTORE READ] ✓ Found {medium}/{journey_stage}/{kpi_doc.id} = {kpi_data.get('kpi_value')}")
-
-                    # If we have KPIs, use the first one for the old structure
-                    # but this should really return all KPIs
-                    if kpi_list:
-                        metrics[medium][journey_stage] = kpi_list[0]  # For backwards compatibility
-                        # TODO: Should return all KPIs, not just first one
-                    else:
-                        print(f"[FIRESTORE READ] ✗ No KPIs found for {medium}/{journey_stage}")
-
-                except Exception as e:
-                    print(f"[FIRESTORE READ ERROR] Could not fetch latest for {medium}/{journey_stage}: {e}")
-        
+        complete = True
+        for (medium, journey_stage), future in zip(pairs, futures):
+            try:
+                # Get all KPIs for this stage (there may be multiple)
+                kpi_list = future.result()
+                for kpi_data in kpi_list:
+                    print(f"[FIRESTORE READ] ✓ Found {medium}/{journey_stage}/{kpi_data['kpi_name']} = {kpi_data.get('kpi_value')}")
+
+                # If we have KPIs, use the first one for the old structure
+                # but this should really return all KPIs
+                if kpi_list:
+                    metrics[medium][journey_stage] = kpi_list[0]  # For backwards compatibility
+                    # TODO: Should return all KPIs, not just first one
+                else:
+                    print(f"[FIRESTORE READ] ✗ No KPIs found for {medium}/{journey_stage}")
+
+            except Exception as e:
+                print(f"[FIRESTORE READ ERROR] Could not fetch latest for {medium}/{journey_stage}: {e}")
+                complete = False
+        
+        # Only cache complete reads that no write has invalidated since
+        with _LATEST_LOCK:
+            invalidated_at = max(_LATEST_INVALIDATED_AT.get(customer_id, 0),
+                                 _LATEST_INVALIDATED_AT.get(None, 0))
+            if complete and invalidated_at < fetched_at:
+                _LATEST_CACHE[customer_id] = (fetched_at, copy.deepcopy(metrics))
         return metrics
 
 
@@ -358,7 +520,7 @@ class TopPerformer:
         date_key = now.strftime('%Y-%m-%d')
         
         # Structure: top_performers/{customer_id}/{medium}/{date}/{item_id}
-        doc_ref = (db.collection(TOP_PERFORMERS_COLLECTION)
+        doc_ref = (_client().collection(TOP_PERFORMERS_COLLECTION)
                    .document(customer_id)
                    .collection(medium)
                    .document(date_key)
@@ -369,7 +531,7 @@ class TopPerformer:
             'item_title': item_title,
             'metric_name': metric_name,
             'metric_value': metric_value,
-            'recorded_at': firestore.SERVER_TIMESTAMP
+            'recorded_at': _firestore().SERVER_TIMESTAMP
         }
         
         doc_ref.set(performer_data)
@@ -383,12 +545,12 @@ class TopPerformer:
         
         try:
             # Get today's top performers
-            items_ref = (db.collection(TOP_PERFORMERS_COLLECTION)
+            items_ref = (_client().collection(TOP_PERFORMERS_COLLECTION)
                         .document(customer_id)
                         .collection(medium)
                         .document(date_key)
                         .collection('items')
-                        .order_by('metric_value', direction=firestore.Query.DESCENDING)
+                        .order_by('metric_value', direction=_firestore().Query.DESCENDING)
                         .limit(limit))
             
             items = items_ref.stream()
@@ -503,20 +665,45 @@ INDUSTRY_BENCHMARKS = {
 }
 
 
+# Flat (industry, medium, journey_stage, kpi) -> benchmark index built once at
+# import, so canonical KPI names resolve with a single dict lookup
+_FLAT_BENCHMARKS = {
+    (industry, medium, journey_stage, kpi.lower()): value
+    for industry, mediums in INDUSTRY_BENCHMARKS.items()
+    for medium, stages in mediums.items()
+    for journey_stage, kpis in stages.items()
+    for kpi, value in kpis.items()
+}
+
+# (industry, medium, journey_stage) -> ((lower-cased kpi, benchmark), ...) for
+# the substring fallback, so benchmark keys aren't lower-cased per call
+_STAGE_BENCHMARKS_LOWER = {
+    (industry, medium, journey_stage): tuple((kpi.lower(), value) for kpi, value in kpis.items())
+    for industry, mediums in INDUSTRY_BENCHMARKS.items()
+    for medium, stages in mediums.items()
+    for journey_stage, kpis in stages.items()
+}
+
+
+@lru_cache(maxsize=512)
 def get_benchmark(industry: str, medium: str, journey_stage: str, kpi_name: str) -> float:
-    """Get benchmark value for a specific KPI"""
+    """Get benchmark value for a specific KPI (memoized; benchmarks are static)"""
     industry_key = industry.lower()
+    if industry_key not in INDUSTRY_BENCHMARKS:
+        industry_key = 'default'
     
-    # Use industry-specific benchmarks or fall back to default
-    benchmarks = INDUSTRY_BENCHMARKS.get(industry_key, INDUSTRY_BENCHMARKS['default'])
+    kpi_key = kpi_name.lower()
     
-    if medium in benchmarks and journey_stage in benchmarks[medium]:
-        stage_benchmarks = benchmarks[medium][journey_stage]
-        
-        # Try to find matching benchmark
-        for key, value in stage_benchmarks.items():
-            if key.lower() in kpi_name.lower() or kpi_name.lower() in key.lower():
-                return value
+    # Exact benchmark key first
+    value = _FLAT_BENCHMARKS.get((industry_key, medium, journey_stage, kpi_key))
+    if value is not None:
+        return value
+    
+    # Otherwise match KPI names that contain (or are contained in) a
+    # benchmark key, e.g. 'total_reach' -> 'reach'
+    for key, value in _STAGE_BENCHMARKS_LOWER.get((industry_key, medium, journey_stage), ()):
+        if key in kpi_key or kpi_key in key:
+            return value
     
     # Default fallback
     return 0
@@ -0,0 +1,49 @@
+"""
+Rate Limiting for External API Calls
+Token bucket shared by collector threads so requests are paced by actual
+API budget instead of fixed sleeps
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks only until a token is available"""
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        """
+        Args:
+            capacity: Maximum burst size (tokens held when idle)
+            refill_per_sec: Tokens added back per second
+        """
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_sec)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, sleeping only as long as needed
+
+        Returns: Seconds spent waiting (0 when a token was available)
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.refill_per_sec
+
+            time.sleep(delay)
+            waited += delay
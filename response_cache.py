@@ -0,0 +1,71 @@
+"""
+Disk Cache for API Responses
+Stores JSON payloads that no longer change (e.g. analytics for months that
+have already closed) so repeat collections skip the network round trip
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+# Override with RESPONSE_CACHE_DIR to keep the cache somewhere persistent
+CACHE_DIR = os.environ.get(
+    'RESPONSE_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'cc_response_cache')
+)
+
+
+class ResponseCache:
+    """JSON file cache, one file per key, grouped by namespace"""
+
+    def __init__(self, namespace: str, cache_dir: str = None):
+        self.directory = os.path.join(cache_dir or CACHE_DIR, namespace)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing or unreadable
+
+        Args:
+            key: Cache key
+            max_age: Optional maximum age in seconds; older entries are ignored
+        """
+        path = self._path(key)
+        try:
+            if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+                return None
+            if orjson is not None:
+                with open(path, 'rb') as f:
+                    return orjson.loads(f.read())
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Any):
+        """Write value for key; failures are logged and otherwise ignored"""
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temp file and rename so readers never see partial JSON
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            if orjson is not None:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(orjson.dumps(value))
+            else:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(value, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[WARNING] Could not write response cache entry: {e}")
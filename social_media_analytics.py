@@ -11,12 +11,169 @@ Customer Journey Stages:
 5. Advocacy - Shares (from post fields)
 """
 
+import concurrent.futures
+from collections import defaultdict
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
 from datetime import datetime, timedelta
 import json
 
+from rate_limiter import TokenBucket
+from response_cache import ResponseCache
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib decoder
+    orjson = None
+
 API_VERSION = "v24.0"
 
+# Maximum sub-requests the Graph API accepts in one batch call
+GRAPH_BATCH_SIZE = 50
+
+# Upper bound on simultaneous Graph API requests from one collection
+MAX_GRAPH_WORKERS = 8
+
+# Insight metrics requested per Facebook post / Instagram media item
+FB_POST_INSIGHT_METRICS = 'post_impressions,post_impressions_unique,post_engaged_users,post_clicks'
+IG_MEDIA_INSIGHT_METRICS = 'saved,shares'
+
+# Days after which an account insights window is treated as final; closed
+# windows older than this are served from the disk cache
+INSIGHTS_SETTLE_DAYS = 30
+
+# Every call goes to graph.facebook.com, so one keep-alive session lets the
+# collectors reuse pooled TLS connections instead of a handshake per request.
+# 5xx GETs are retried with backoff; throttling (429) is left to
+# _graph_request, and the last response is returned rather than raised so
+# callers' status checks still run
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.5,
+                      status_forcelist=[500, 502, 503, 504],
+                      raise_on_status=False)
+)
+_SESSION.mount('https://', _ADAPTER)
+# Ask for compressed bodies (gzip/deflate, plus br when brotli is installed)
+_SESSION.headers['Accept-Encoding'] = make_headers(accept_encoding=True)['accept-encoding']
+
+# Settled Instagram account insights, keyed by account, metrics and month
+_GRAPH_CACHE = ResponseCache('graph')
+
+# Graph API budget shared by every collector thread: bursts of 50 HTTP calls,
+# refilled at one call per second
+_GRAPH_BUCKET = TokenBucket(capacity=50, refill_per_sec=1)
+
+# Graph error codes that mean "throttled" (app, user, page and per-action
+# limits); these arrive as 400/403 responses, so the adapter does not retry them
+GRAPH_THROTTLE_CODES = {4, 17, 32, 613}
+GRAPH_THROTTLE_RETRIES = 3
+GRAPH_THROTTLE_BACKOFF = 2.0  # Seconds, doubled on each retry
+
+
+def _json(response):
+    """Decode a Graph API response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _graph_request(method, url, **kwargs):
+    """
+    Send a Graph API request through the shared session and rate limiter
+
+    Throttling responses (429, or an error code in GRAPH_THROTTLE_CODES) are
+    retried after the Retry-After delay or an exponential backoff; the last
+    response is returned either way so callers keep their own error handling
+    """
+    for attempt in range(GRAPH_THROTTLE_RETRIES + 1):
+        _GRAPH_BUCKET.acquire()
+        response = _SESSION.request(method, url, **kwargs)
+
+        if response.status_code == 429:
+            throttled = True
+        elif response.status_code in (400, 403):
+            try:
+                error = _json(response).get('error') or {}
+            except (ValueError, AttributeError):
+                error = {}
+            throttled = error.get('code') in GRAPH_THROTTLE_CODES
+        else:
+            throttled = False
+
+        if not throttled or attempt == GRAPH_THROTTLE_RETRIES:
+            return response
+
+        try:
+            delay = float(response.headers.get('Retry-After', ''))
+        except ValueError:
+            delay = GRAPH_THROTTLE_BACKOFF * 2 ** attempt
+        print(f"  [Graph API] Throttled ({response.status_code}), retrying in {delay:.0f}s")
+        time.sleep(delay)
+
+
+def _month_key(timestamp):
+    """
+    YYYY-MM month key for a Graph API ISO timestamp, or None if malformed
+
+    The API returns "YYYY-MM-DDTHH:MM:SS+0000", so the key is a plain slice
+    rather than a full strptime parse per row
+    """
+    if len(timestamp) >= 7 and timestamp[4] == '-' and timestamp[:4].isdigit() and timestamp[5:7].isdigit():
+        return timestamp[:7]
+    return None
+
+
+def graph_batch_get(relative_urls, access_token, timeout=60):
+    """
+    Run Graph API GETs through the batch endpoint, GRAPH_BATCH_SIZE per call
+    
+    Args:
+        relative_urls: Paths relative to graph.facebook.com, e.g.
+                       f"{API_VERSION}/{post_id}/insights?metric=..."
+        access_token: Token used for every sub-request
+    
+    Returns: List aligned with relative_urls of (status_code, body) tuples;
+             body is the decoded JSON, or None if the sub-request (or the
+             whole batch call) failed
+    """
+    results = []
+    for offset in range(0, len(relative_urls), GRAPH_BATCH_SIZE):
+        chunk = relative_urls[offset:offset + GRAPH_BATCH_SIZE]
+        try:
+            response = _graph_request(
+                'POST',
+                "https://graph.facebook.com/",
+                data={
+                    'access_token': access_token,
+                    'include_headers': 'false',
+                    'batch': json.dumps([{'method': 'GET', 'relative_url': url} for url in chunk])
+                },
+                timeout=timeout
+            )
+            response.raise_for_status()
+            replies = _json(response)
+        except Exception as e:
+            print(f"  [Graph API] Batch request failed: {e}")
+            replies = [None] * len(chunk)
+        
+        for reply in replies:
+            # A null entry means that sub-request timed out server-side
+            if not reply:
+                results.append((None, None))
+                continue
+            try:
+                body = json.loads(reply.get('body') or 'null')
+            except ValueError:
+                body = None
+            results.append((reply.get('code'), body))
+    return results
+
+
 # ============================================================================
 # FACEBOOK - POST-LEVEL INSIGHTS (THESE WORK!)
 # ============================================================================
@@ -41,26 +198,61 @@ def get_facebook_post_insights_bulk(page_id, page_token, days_back=365):
     start_date = end_date - timedelta(days=days_back)
     since_timestamp = int(start_date.timestamp())
     
-    # Step 1: Get posts with engagement fields
+    # Step 1: Get posts with engagement fields, expanding each post's
+    # insights inline so one request returns both
     posts_url = f"https://graph.facebook.com/{API_VERSION}/{page_id}/posts"
+    post_fields = 'id,created_time,shares,reactions.summary(true),comments.summary(true)'
     posts_params = {
-        'fields': 'id,created_time,shares,reactions.summary(true),comments.summary(true)',
+        'fields': f"{post_fields},insights.metric({FB_POST_INSIGHT_METRICS})",
         'since': since_timestamp,
         'access_token': page_token,
         'limit': 100  # Max posts to analyze
     }
     
     try:
-        posts_response = requests.get(posts_url, params=posts_params, timeout=30)
-        posts_response.raise_for_status()
-        posts_data = posts_response.json().get('data', [])
+        try:
+            posts_response = _graph_request('GET', posts_url, params=posts_params, timeout=30)
+            posts_response.raise_for_status()
+        except Exception as e:
+            # Expansion is rejected for some pages/post types; fall back to
+            # plain fields and fetch insights separately below
+            print(f"  [Facebook] Inline insights unavailable ({e}), fetching separately")
+            posts_params['fields'] = post_fields
+            posts_response = _graph_request('GET', posts_url, params=posts_params, timeout=30)
+            posts_response.raise_for_status()
+        posts_data = _json(posts_response).get('data', [])
         print(f"  [Facebook] Found {len(posts_data)} posts")
     except Exception as e:
         print(f"  [Facebook] Failed to get posts: {e}")
         return {}
     
-    # Step 2: Get POST-LEVEL insights for each post
-    monthly_data = {}
+    # Step 2: Bucket posts by month and add POST-LEVEL insights
+    monthly_data = defaultdict(lambda: {
+        'reach': 0,              # post_impressions_unique (REAL)
+        'impressions': 0,        # post_impressions (REAL)
+        'engaged_users': 0,      # post_engaged_users (REAL)
+        'clicks': 0,             # post_clicks (REAL)
+        'reactions': 0,          # From post fields (REAL)
+        'comments': 0,           # From post fields (REAL)
+        'shares': 0,             # From post fields (REAL)
+        'posts': 0
+    })
+    insight_posts = []  # (post_id, month_key) still needing insights
+    
+    def add_insights(month_key, insights_data):
+        for insight in insights_data:
+            metric_name = insight.get('name')
+            values = insight.get('values', [{}])
+            value = values[0].get('value', 0) if values else 0
+            
+            if metric_name == 'post_impressions':
+                monthly_data[month_key]['impressions'] += value
+            elif metric_name == 'post_impressions_unique':
+                monthly_data[month_key]['reach'] += value
+            elif metric_name == 'post_engaged_users':
+                monthly_data[month_key]['engaged_users'] += value
+            elif metric_name == 'post_clicks':
+                monthly_data[month_key]['clicks'] += value
     
     for post in posts_data:
         try:
@@ -70,22 +262,10 @@ def get_facebook_post_insights_bulk(page_id, page_token, days_back=365):
             if not created_time:
                 continue
             
-            # Parse date and determine month
-            post_date = datetime.strptime(created_time[:10], '%Y-%m-%d')
-            month_key = f"{post_date.year}-{post_date.month:02d}"
-            
-            # Initialize month bucket
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {
-                    'reach': 0,              # post_impressions_unique (REAL)
-                    'impressions': 0,        # post_impressions (REAL)
-                    'engaged_users': 0,      # post_engaged_users (REAL)
-                    'clicks': 0,             # post_clicks (REAL)
-                    'reactions': 0,          # From post fields (REAL)
-                    'comments': 0,           # From post fields (REAL)
-                    'shares': 0,             # From post fields (REAL)
-                    'posts': 0
-                }
+            # Determine month
+            month_key = _month_key(created_time)
+            if month_key is None:
+                continue
             
             monthly_data[month_key]['posts'] += 1
             
@@ -98,36 +278,29 @@ def get_facebook_post_insights_bulk(page_id, page_token, days_back=365):
             monthly_data[month_key]['comments'] += comments
             monthly_data[month_key]['shares'] += shares
             
-            # Get post-level insights (THE KEY PART - THESE STILL WORK!)
-            insights_url = f"https://graph.facebook.com/{API_VERSION}/{post_id}/insights"
-            insights_params = {
-                'metric': 'post_impressions,post_impressions_unique,post_engaged_users,post_clicks',
-                'access_token': page_token
-            }
-            
-            insights_response = requests.get(insights_url, params=insights_params, timeout=10)
-            
-            if insights_response.status_code == 200:
-                insights_data = insights_response.json().get('data', [])
-                
-                for insight in insights_data:
-                    metric_name = insight.get('name')
-                    values = insight.get('values', [{}])
-                    value = values[0].get('value', 0) if values else 0
-                    
-                    if metric_name == 'post_impressions':
-                        monthly_data[month_key]['impressions'] += value
-                    elif metric_name == 'post_impressions_unique':
-                        monthly_data[month_key]['reach'] += value
-                    elif metric_name == 'post_engaged_users':
-                        monthly_data[month_key]['engaged_users'] += value
-                    elif metric_name == 'post_clicks':
-                        monthly_data[month_key]['clicks'] += value
+            # Post-level insights (THE KEY PART - THESE STILL WORK!)
+            if 'insights' in post:
+                add_insights(month_key, post['insights'].get('data', []))
+            else:
+                insight_posts.append((post_id, month_key))
             
         except Exception as e:
             print(f"  [Facebook] Warning: Failed to process post: {e}")
             continue
     
+    # Posts that came back without inline insights: up to 50 per HTTP call
+    # through the batch endpoint
+    if insight_posts:
+        insight_replies = graph_batch_get(
+            [f"{API_VERSION}/{post_id}/insights?metric={FB_POST_INSIGHT_METRICS}"
+             for post_id, _ in insight_posts],
+            page_token
+        )
+        
+        for (post_id, month_key), (status, body) in zip(insight_posts, insight_replies):
+            if status == 200 and isinstance(body, dict):
+                add_insights(month_key, body.get('data', []))
+    
     # Get current fan count (still available as page field)
     try:
         page_url = f"https://graph.facebook.com/{API_VERSION}/{page_id}"
@@ -135,15 +308,15 @@ def get_facebook_post_insights_bulk(page_id, page_token, days_back=365):
             'fields': 'fan_count,followers_count',
             'access_token': page_token
         }
-        page_response = requests.get(page_url, params=page_params, timeout=10)
-        page_data = page_response.json()
+        page_response = _graph_request('GET', page_url, params=page_params, timeout=10)
+        page_data = _json(page_response)
         fan_count = page_data.get('fan_count', 0)
         print(f"  [Facebook] Fan count: {fan_count:,}")
     except:
         fan_count = 0
     
     result = {
-        'monthly_data': monthly_data,
+        'monthly_data': dict(monthly_data),
         'fan_count': fan_count
     }
     
@@ -167,7 +340,9 @@ def get_instagram_insights_bulk(instagram_id, page_token, days_back=365):
     - Impressions (daily aggregation)
     - Follower count (current)
 
-    Makes multiple 30-day API calls to build historical data
+    Makes one API call per calendar month (the API allows at most 30 days
+    per call) to build historical data; whole months that closed more than
+    INSIGHTS_SETTLE_DAYS ago are read from the disk cache when present
     """
     print(f"  [Instagram] Fetching account insights for last {days_back} days...")
 
@@ -180,14 +355,31 @@ def get_instagram_insights_bulk(instagram_id, page_token, days_back=365):
     # Note: impressions may require metric_type parameter similar to accounts_engaged
     metrics = 'reach,impressions'
 
-    monthly_data = {}
+    monthly_data = defaultdict(lambda: {'reach': 0, 'impressions': 0})
 
-    # Split into 30-day chunks
+    # Split into calendar-month chunks (at most 30 days apart) so a closed
+    # month always maps to the same cache key
+    chunks = []
     current_chunk_end = end_date
     while current_chunk_end > start_date:
-        current_chunk_start = max(current_chunk_end - timedelta(days=30), start_date)
+        current_chunk_start = max(current_chunk_end.replace(day=1), start_date)
+        chunks.append((current_chunk_start, current_chunk_end))
+        # Move to next chunk
+        current_chunk_end = current_chunk_start - timedelta(days=1)
 
-        print(f"    Fetching chunk: {current_chunk_start.strftime('%Y-%m-%d')} to {current_chunk_end.strftime('%Y-%m-%d')}")
+    settled_before = end_date - timedelta(days=INSIGHTS_SETTLE_DAYS)
+
+    def fetch_chunk(chunk):
+        """Daily metric objects for one chunk, or [] if the request failed"""
+        current_chunk_start, current_chunk_end = chunk
+        # Only whole, settled months are cached; the partial first month and
+        # recent months are always fetched
+        cache_key = None
+        if current_chunk_start.day == 1 and current_chunk_end < settled_before:
+            cache_key = f"{instagram_id}:{metrics}:{current_chunk_start.strftime('%Y-%m')}"
+            cached = _GRAPH_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
 
         params = {
             'metric': metrics,
@@ -199,7 +391,7 @@ def get_instagram_insights_bulk(instagram_id, page_token, days_back=365):
         }
 
         try:
-            response = requests.get(insights_url, params=params, timeout=30)
+            response = _graph_request('GET', insights_url, params=params, timeout=30)
 
             # Check status and provide detailed error info if failed
             if response.status_code != 200:
@@ -207,49 +399,53 @@ def get_instagram_insights_bulk(instagram_id, page_token, days_back=365):
                 print(f"    URL: {insights_url}")
                 print(f"    Params: {params}")
                 try:
-                    error_data = response.json()
+                    error_data = _json(response)
                     print(f"    Response body: {json.dumps(error_data, indent=2)}")
                 except:
                     print(f"    Response text: {response.text}")
 
             response.raise_for_status()
-            data = response.json().get('data', [])
+            data = _json(response).get('data', [])
+            if cache_key and data:
+                _GRAPH_CACHE.set(cache_key, data)
+            return data
 
-            # Process each metric's daily values
-            for metric_obj in data:
-                metric_name = metric_obj.get('name')
-                values = metric_obj.get('values', [])
+        except Exception as e:
+            print(f"    [ERROR] Failed chunk {current_chunk_start.strftime('%Y-%m-%d')} to {current_chunk_end.strftime('%Y-%m-%d')}: {e}")
+            print(f"    Instagram ID: {instagram_id}, Token available: {bool(page_token)}")
+            import traceback
+            traceback.print_exc()
+            return []
 
-                for value_obj in values:
-                    value = value_obj.get('value', 0)
-                    end_time = value_obj.get('end_time', '')
+    for current_chunk_start, current_chunk_end in chunks:
+        print(f"    Fetching chunk: {current_chunk_start.strftime('%Y-%m-%d')} to {current_chunk_end.strftime('%Y-%m-%d')}")
 
-                    if not end_time:
-                        continue
+    # Chunks are independent date ranges, so request them concurrently and
+    # aggregate the results in chunk order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(len(chunks), MAX_GRAPH_WORKERS))) as executor:
+        chunk_results = list(executor.map(fetch_chunk, chunks))
 
-                    # Parse date and determine month
-                    date = datetime.strptime(end_time[:10], '%Y-%m-%d')
-                    month_key = f"{date.year}-{date.month:02d}"
+    for data in chunk_results:
+        # Process each metric's daily values
+        for metric_obj in data:
+            metric_name = metric_obj.get('name')
+            values = metric_obj.get('values', [])
 
-                    # Initialize month bucket
-                    if month_key not in monthly_data:
-                        monthly_data[month_key] = {
-                            'reach': 0,
-                            'impressions': 0
-                        }
+            for value_obj in values:
+                value = value_obj.get('value', 0)
+                end_time = value_obj.get('end_time', '')
 
-                    # Aggregate by month
-                    if metric_name in monthly_data[month_key]:
-                        monthly_data[month_key][metric_name] += value
+                if not end_time:
+                    continue
 
-        except Exception as e:
-            print(f"    [ERROR] Failed chunk {current_chunk_start.strftime('%Y-%m-%d')} to {current_chunk_end.strftime('%Y-%m-%d')}: {e}")
-            print(f"    Instagram ID: {instagram_id}, Token available: {bool(page_token)}")
-            import traceback
-            traceback.print_exc()
+                # Determine month
+                month_key = _month_key(end_time)
+                if month_key is None:
+                    continue
 
-        # Move to next chunk
-        current_chunk_end = current_chunk_start - timedelta(days=1)
+                # Aggregate by month
+                if metric_name in monthly_data[month_key]:
+                    monthly_data[month_key][metric_name] += value
 
     print(f"  [Instagram] ✓ Collected account data for {len(monthly_data)} months")
 
@@ -260,8 +456,8 @@ def get_instagram_insights_bulk(instagram_id, page_token, days_back=365):
             'period': 'day',
             'access_token': page_token
         }
-        follower_response = requests.get(insights_url, params=follower_params, timeout=10)
-        follower_data = follower_response.json().get('data', [])
+        follower_response = _graph_request('GET', insights_url, params=follower_params, timeout=10)
+        follower_data = _json(follower_response).get('data', [])
         
         if follower_data and follower_data[0].get('values'):
             follower_count = follower_data[0]['values'][-1].get('value', 0)
@@ -272,7 +468,7 @@ def get_instagram_insights_bulk(instagram_id, page_token, days_back=365):
         follower_count = 0
     
     return {
-        'monthly_data': monthly_data,
+        'monthly_data': dict(monthly_data),
         'follower_count': follower_count
     }
 
@@ -295,14 +491,20 @@ def get_instagram_media_insights_bulk(instagram_id, page_token, days_back=365):
     # Get media
     media_url = f"https://graph.facebook.com/{API_VERSION}/{instagram_id}/media"
     media_params = {
-        'fields': 'id,timestamp',
+        'fields': f"id,timestamp,insights.metric({IG_MEDIA_INSIGHT_METRICS})",
         'since': since_timestamp,
         'access_token': page_token,
         'limit': 100
     }
     
     try:
-        media_response = requests.get(media_url, params=media_params, timeout=30)
+        media_response = _graph_request('GET', media_url, params=media_params, timeout=30)
+        if media_response.status_code != 200:
+            # Expansion is rejected for some media types; fall back to plain
+            # fields and fetch insights separately below
+            print(f"  [Instagram] Inline media insights unavailable ({media_response.status_code}), fetching separately")
+            media_params['fields'] = 'id,timestamp'
+            media_response = _graph_request('GET', media_url, params=media_params, timeout=30)
 
         # Check status and provide detailed error info if failed
         if media_response.status_code != 200:
@@ -311,13 +513,13 @@ def get_instagram_media_insights_bulk(instagram_id, page_token, days_back=365):
             print(f"  Instagram ID: {instagram_id}")
             print(f"  Params: since={since_timestamp} ({start_date.strftime('%Y-%m-%d')})")
             try:
-                error_data = media_response.json()
+                error_data = _json(media_response)
                 print(f"  Response body: {json.dumps(error_data, indent=2)}")
             except:
                 print(f"  Response text: {media_response.text}")
 
         media_response.raise_for_status()
-        media_items = media_response.json().get('data', [])
+        media_items = _json(media_response).get('data', [])
         print(f"  [Instagram] Found {len(media_items)} media items")
     except Exception as e:
         print(f"  [ERROR] Failed to get Instagram media: {e}")
@@ -325,7 +527,17 @@ def get_instagram_media_insights_bulk(instagram_id, page_token, days_back=365):
         traceback.print_exc()
         return {}
     
-    monthly_data = {}
+    monthly_data = defaultdict(lambda: {'saved': 0, 'shares': 0})
+    insight_media = []  # (media_id, month bucket) still needing insights
+    
+    def add_insights(bucket, insights_data):
+        for insight in insights_data:
+            metric_name = insight.get('name')
+            values = insight.get('values', [{}])
+            value = values[0].get('value', 0) if values else 0
+
+            if metric_name in bucket:
+                bucket[metric_name] += value
     
     for media in media_items:
         try:
@@ -335,51 +547,42 @@ def get_instagram_media_insights_bulk(instagram_id, page_token, days_back=365):
             if not timestamp:
                 continue
             
-            # Parse date
-            media_date = datetime.strptime(timestamp[:10], '%Y-%m-%d')
-            month_key = f"{media_date.year}-{media_date.month:02d}"
-            
-            # Initialize month bucket
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {
-                    'saved': 0,
-                    'shares': 0
-                }
+            # Determine month
+            month_key = _month_key(timestamp)
+            if month_key is None:
+                continue
             
-            # Get media insights
-            insights_url = f"https://graph.facebook.com/{API_VERSION}/{media_id}/insights"
-            insights_params = {
-                'metric': 'saved,shares',
-                'access_token': page_token
-            }
+            # Looking the bucket up creates it, so months whose media have
+            # no insights are still reported
+            bucket = monthly_data[month_key]
             
-            insights_response = requests.get(insights_url, params=insights_params, timeout=10)
-
-            if insights_response.status_code == 200:
-                insights_data = insights_response.json().get('data', [])
-
-                for insight in insights_data:
-                    metric_name = insight.get('name')
-                    values = insight.get('values', [{}])
-                    value = values[0].get('value', 0) if values else 0
-
-                    if metric_name in monthly_data[month_key]:
-                        monthly_data[month_key][metric_name] += value
+            if 'insights' in media:
+                add_insights(bucket, media['insights'].get('data', []))
             else:
-                print(f"    [API ERROR] Instagram Media Insights returned {insights_response.status_code} for media {media_id}")
-                print(f"    URL: {insights_url}")
-                try:
-                    error_data = insights_response.json()
-                    print(f"    Response body: {json.dumps(error_data, indent=2)}")
-                except:
-                    print(f"    Response text: {insights_response.text}")
+                insight_media.append((media_id, bucket))
 
         except Exception as e:
             print(f"    [WARNING] Failed to process media {media.get('id', 'unknown')}: {e}")
             continue
     
+    # Media that came back without inline insights: up to 50 per HTTP call
+    if insight_media:
+        insight_replies = graph_batch_get(
+            [f"{API_VERSION}/{media_id}/insights?metric={IG_MEDIA_INSIGHT_METRICS}"
+             for media_id, _ in insight_media],
+            page_token
+        )
+        
+        for (media_id, bucket), (status, body) in zip(insight_media, insight_replies):
+            if status == 200 and isinstance(body, dict):
+                add_insights(bucket, body.get('data', []))
+            else:
+                print(f"    [API ERROR] Instagram Media Insights returned {status} for media {media_id}")
+                if body is not None:
+                    print(f"    Response body: {json.dumps(body, indent=2)}")
+    
     print(f"  [Instagram] ✓ Collected media data for {len(monthly_data)} months")
-    return {'monthly_data': monthly_data}
+    return {'monthly_data': dict(monthly_data)}
 
 
 # ============================================================================
@@ -421,10 +624,15 @@ def collect_social_media_real_metrics(page_id, page_token, instagram_id, days_ba
     print("COLLECTING REAL SOCIAL MEDIA METRICS")
     print("="*70)
     
-    # Collect from all sources
-    fb_data = get_facebook_post_insights_bulk(page_id, page_token, days_back)
-    ig_account_data = get_instagram_insights_bulk(instagram_id, page_token, days_back)
-    ig_media_data = get_instagram_media_insights_bulk(instagram_id, page_token, days_back)
+    # Collect from all sources; the three collectors are independent, so
+    # run them concurrently
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        fb_future = executor.submit(get_facebook_post_insights_bulk, page_id, page_token, days_back)
+        ig_account_future = executor.submit(get_instagram_insights_bulk, instagram_id, page_token, days_back)
+        ig_media_future = executor.submit(get_instagram_media_insights_bulk, instagram_id, page_token, days_back)
+    fb_data = fb_future.result()
+    ig_account_data = ig_account_future.result()
+    ig_media_data = ig_media_future.result()
     
     # Merge by month
     all_months = set()
@@ -494,20 +702,20 @@ def get_all_pages_and_instagram_accounts(system_token):
     params = {'access_token': system_token}
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = _graph_request('GET', url, params=params, timeout=30)
 
         # Check status and provide detailed error info if failed
         if response.status_code != 200:
             print(f"[API ERROR] Facebook Pages API returned {response.status_code}")
             print(f"URL: {url}")
             try:
-                error_data = response.json()
+                error_data = _json(response)
                 print(f"Response body: {json.dumps(error_data, indent=2)}")
             except:
                 print(f"Response text: {response.text}")
 
         response.raise_for_status()
-        pages_data = response.json().get('data', [])
+        pages_data = _json(response).get('data', [])
     except requests.exceptions.RequestException as e:
         print(f"[ERROR] Failed to fetch Facebook pages: {e}")
         import traceback
@@ -539,7 +747,7 @@ def get_all_pages_and_instagram_accounts(system_token):
         }
 
         try:
-            ig_response = requests.get(ig_url, params=ig_params, timeout=30)
+            ig_response = _graph_request('GET', ig_url, params=ig_params, timeout=30)
 
             # Check status and provide detailed error info if failed
             if ig_response.status_code != 200:
@@ -547,13 +755,13 @@ def get_all_pages_and_instagram_accounts(system_token):
                 print(f"  URL: {ig_url}")
                 print(f"  Page ID: {page_id}")
                 try:
-                    error_data = ig_response.json()
+                    error_data = _json(ig_response)
                     print(f"  Response body: {json.dumps(error_data, indent=2)}")
                 except:
                     print(f"  Response text: {ig_response.text}")
 
             ig_response.raise_for_status()
-            ig_data = ig_response.json()
+            ig_data = _json(ig_response)
 
             instagram_id = ig_data.get('instagram_business_account', {}).get('id')
             fan_count = ig_data.get('fan_count', 0)
@@ -637,7 +845,7 @@ def get_facebook_posts_engagement(page_id, page_token, days_back=365):
 
     try:
         # First request
-        response = requests.get(url, params=params, timeout=30)
+        response = _graph_request('GET', url, params=params, timeout=30)
 
         # Check status and provide detailed error info if failed
         if response.status_code != 200:
@@ -646,7 +854,7 @@ def get_facebook_posts_engagement(page_id, page_token, days_back=365):
             print(f"  Page ID: {page_id}")
             print(f"  Token being used: {token_preview}")
             try:
-                error_data = response.json()
+                error_data = _json(response)
                 print(f"  Response body: {json.dumps(error_data, indent=2)}")
                 # Check for permission errors
                 if 'error' in error_data:
@@ -664,19 +872,20 @@ def get_facebook_posts_engagement(page_id, page_token, days_back=365):
                 print(f"  Response text: {response.text}")
 
         response.raise_for_status()
-        data = response.json()
+        data = _json(response)
 
         posts = data.get('data', [])
         posts_fetched += len(posts)
 
         for post in posts:
-                # Parse post date
+                # Post month
                 created_time = post.get('created_time')
                 if not created_time:
                     continue
 
-                post_date = datetime.strptime(created_time[:10], '%Y-%m-%d')
-                month_key = f"{post_date.year}-{post_date.month:02d}"
+                month_key = _month_key(created_time)
+                if month_key is None:
+                    continue
 
                 # Initialize month bucket
                 if month_key not in monthly_data:
@@ -701,9 +910,9 @@ def get_facebook_posts_engagement(page_id, page_token, days_back=365):
         while data.get('paging', {}).get('next'):
             next_url = data['paging']['next']
             # Next URL already includes access_token
-            response = requests.get(next_url, timeout=30)
+            response = _graph_request('GET', next_url, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = _json(response)
 
             posts = data.get('data', [])
             posts_fetched += len(posts)
@@ -713,8 +922,9 @@ def get_facebook_posts_engagement(page_id, page_token, days_back=365):
                 if not created_time:
                     continue
 
-                post_date = datetime.strptime(created_time[:10], '%Y-%m-%d')
-                month_key = f"{post_date.year}-{post_date.month:02d}"
+                month_key = _month_key(created_time)
+                if month_key is None:
+                    continue
 
                 if month_key not in monthly_data:
                     monthly_data[month_key] = {
@@ -807,7 +1017,7 @@ def get_instagram_account_insights(instagram_id, page_token, days_back=7):
                 if metric == 'accounts_engaged':
                     params['metric_type'] = 'total_value'
 
-                response = requests.get(url, params=params, timeout=30)
+                response = _graph_request('GET', url, params=params, timeout=30)
 
                 # Check status and provide detailed error info if failed
                 if response.status_code != 200:
@@ -816,13 +1026,13 @@ def get_instagram_account_insights(instagram_id, page_token, days_back=7):
                     print(f"      Params: metric={metric}, period=day, since={current_chunk_start.strftime('%Y-%m-%d')}, until={current_chunk_end.strftime('%Y-%m-%d')}")
                     print(f"      Instagram ID: {instagram_id}")
                     try:
-                        error_data = response.json()
+                        error_data = _json(response)
                         print(f"      Response body: {json.dumps(error_data, indent=2)}")
                     except:
                         print(f"      Response text: {response.text}")
 
                 response.raise_for_status()
-                data = response.json().get('data', [])
+                data = _json(response).get('data', [])
                 if data:
                     values = data[0].get('values', [])
                     all_values[metric].extend(values)
@@ -854,7 +1064,7 @@ def get_instagram_account_insights(instagram_id, page_token, days_back=7):
             'period': 'day',
             'access_token': page_token
         }
-        response = requests.get(url, params=params, timeout=30)
+        response = _graph_request('GET', url, params=params, timeout=30)
 
         # Check status and provide detailed error info if failed
         if response.status_code != 200:
@@ -862,13 +1072,13 @@ def get_instagram_account_insights(instagram_id, page_token, days_back=7):
             print(f"      URL: {url}")
             print(f"      Instagram ID: {instagram_id}")
             try:
-                error_data = response.json()
+                error_data = _json(response)
                 print(f"      Response body: {json.dumps(error_data, indent=2)}")
             except:
                 print(f"      Response text: {response.text}")
 
         response.raise_for_status()
-        data = response.json().get('data', [])
+        data = _json(response).get('data', [])
         if data:
             insights['follower_count'] = data[0].get('values', [])
     except requests.exceptions.RequestException as e:
@@ -899,7 +1109,7 @@ def get_instagram_media_insights(instagram_id, page_token, limit=20):
     }
 
     try:
-        media_response = requests.get(media_url, params=media_params, timeout=30)
+        media_response = _graph_request('GET', media_url, params=media_params, timeout=30)
 
         # Check status and provide detailed error info if failed
         if media_response.status_code != 200:
@@ -907,26 +1117,27 @@ def get_instagram_media_insights(instagram_id, page_token, limit=20):
             print(f"  URL: {media_url}")
             print(f"  Instagram ID: {instagram_id}")
             try:
-                error_data = media_response.json()
+                error_data = _json(media_response)
                 print(f"  Response body: {json.dumps(error_data, indent=2)}")
             except:
                 print(f"  Response text: {media_response.text}")
 
         media_response.raise_for_status()
-        media_list = media_response.json().get('data', [])
+        media_list = _json(media_response).get('data', [])
     except requests.exceptions.RequestException as e:
         print(f"  [ERROR] Failed to fetch Instagram media: {e}")
         import traceback
         traceback.print_exc()
         return []
 
-    media_insights = []
-    for media in media_list:
+    metrics = ['reach', 'saved', 'likes', 'comments', 'shares', 'total_interactions']
+
+    def fetch_media_insights(media):
+        """Insights for one media item, one GET per metric"""
         media_id = media['id']
 
         # Get insights for this media
         insights_url = f"https://graph.facebook.com/{API_VERSION}/{media_id}/insights"
-        metrics = ['reach', 'saved', 'likes', 'comments', 'shares', 'total_interactions']
 
         post_data = {
             'id': media_id,
@@ -940,7 +1151,7 @@ def get_instagram_media_insights(instagram_id, page_token, limit=20):
         for metric in metrics:
             try:
                 params = {'metric': metric, 'access_token': page_token}
-                response = requests.get(insights_url, params=params, timeout=10)
+                response = _graph_request('GET', insights_url, params=params, timeout=10)
 
                 # Check status and provide detailed error info if failed
                 if response.status_code != 200:
@@ -948,13 +1159,13 @@ def get_instagram_media_insights(instagram_id, page_token, limit=20):
                     print(f"    URL: {insights_url}")
                     print(f"    Media ID: {media_id}")
                     try:
-                        error_data = response.json()
+                        error_data = _json(response)
                         print(f"    Response body: {json.dumps(error_data, indent=2)}")
                     except:
                         print(f"    Response text: {response.text}")
 
                 response.raise_for_status()
-                data = response.json().get('data', [])
+                data = _json(response).get('data', [])
                 if data:
                     values = data[0].get('values', [{}])
                     post_data['insights'][metric] = values[0].get('value') if values else 0
@@ -962,9 +1173,15 @@ def get_instagram_media_insights(instagram_id, page_token, limit=20):
                 print(f"    [WARNING] Failed to fetch Instagram media metric '{metric}' for media {media_id}: {e}")
                 post_data['insights'][metric] = 0
 
-        media_insights.append(post_data)
+        return post_data
+
+    if not media_list:
+        return []
 
-    return media_insights
+    # Each media item is independent and the GETs block on the network, so
+    # fetch them concurrently; map keeps the original media order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(media_list), MAX_GRAPH_WORKERS)) as executor:
+        return list(executor.map(fetch_media_insights, media_list))
 
 
 if __name__ == '__main__':